@@ -1,17 +1,53 @@
 import argparse
-import json
+import functools
+import hashlib
 import os
 import sys
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from .core import ExchangeEmailer
 from .exceptions import ExchangeEmailerError
-from .templates import TemplateType, register_custom_template
+from .templates import (
+    TemplateType,
+    _has_body_field,
+    list_custom_templates,
+    register_custom_template,
+)
+from .utils import json_loads
 
+# --template choice -> template passed to the emailer
+_TEMPLATE_MAP: dict[str, str | TemplateType] = {
+    "persian": TemplateType.PERSIAN,
+    "farsi": TemplateType.PERSIAN,
+    "rtl": TemplateType.PERSIAN,
+    "fa": TemplateType.PERSIAN,
+    "default": TemplateType.DEFAULT,
+    "english": TemplateType.DEFAULT,
+    "ltr": TemplateType.DEFAULT,
+    "en": TemplateType.DEFAULT,
+    "minimal": "minimal",
+    "simple": "minimal",
+    "plain": TemplateType.PLAIN,
+    "none": TemplateType.PLAIN,
+}
 
-def parse_args(args=None):
-    """Parse command line arguments."""
+
+def _template_name(raw_template: bytes) -> str:
+    """Derive a registry name from template bytes, stable across runs unlike hash()."""
+    return f"_cli_tmpl_{hashlib.blake2b(raw_template, digest_size=8).hexdigest()}"
+
+
+def _parse_template_vars(value: str) -> dict[str, Any]:
+    """Parse --template-vars JSON; an empty value means no variables."""
+    return json_loads(value) if value else {}
+
+
+@functools.cache
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser once per process."""
     parser = argparse.ArgumentParser(
         description="Send emails via Microsoft Exchange server",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
@@ -38,7 +74,7 @@ def parse_args(args=None):
     parser.add_argument(
         "--template-vars",
         help='Template variables as JSON (e.g., \'{"date": "1404/11/18"}\')',
-        type=json.loads,
+        type=_parse_template_vars,
         default={},
     )
 
@@ -76,7 +112,12 @@ def parse_args(args=None):
         "--no-rsvp", action="store_true", help="Do not request responses/RSVP from attendees"
     )
 
-    return parser.parse_args(args)
+    return parser
+
+
+def parse_args(args=None):
+    """Parse command line arguments."""
+    return build_parser().parse_args(args)
 
 
 def parse_datetime(dt_str: str) -> datetime:
@@ -91,24 +132,34 @@ def parse_datetime(dt_str: str) -> datetime:
         sys.exit(1)
 
 
+def resolve_attachments(paths: Sequence[str]) -> list[str]:
+    """Expand and resolve attachment paths, dropping (and reporting) missing ones."""
+    attachments = []
+    for attachment in paths:
+        # Resolve symlinks before ".." so the checked path is the one that gets read
+        expanded_path = os.path.realpath(os.path.expanduser(attachment))
+        if os.path.exists(expanded_path):
+            attachments.append(expanded_path)
+        else:
+            print(f"⚠️  Warning: Attachment not found: {expanded_path}", file=sys.stderr)
+    return attachments
+
+
 def main():
     """Main CLI entry point."""
     args = parse_args()
 
-    safe_body = args.body or ""
-
-    # 1. Handle body content using a match case with a guard clause
-    match safe_body:
-        case body_text if body_text.startswith("@"):
-            file_path = body_text[1:]
-            try:
-                with open(file_path, encoding="utf-8") as f:
-                    body_content = f.read()
-            except Exception as e:
-                print(f"❌ Error reading body file '{file_path}': {e!s}", file=sys.stderr)
-                sys.exit(1)
-        case text:
-            body_content = text
+    body_content = args.body or ""
+
+    # 1. Handle body content: an "@" prefix means read it from a file
+    if body_content[:1] == "@":
+        file_path = body_content[1:]
+        try:
+            # Text mode keeps universal newlines: CRLF and lone CR files send "\n"
+            body_content = Path(file_path).read_text(encoding="utf-8")
+        except Exception as e:
+            print(f"❌ Error reading body file '{file_path}': {e!s}", file=sys.stderr)
+            sys.exit(1)
 
     # Handle template selection
     template = None
@@ -116,20 +167,22 @@ def main():
         # Load custom template from file
         template_path = Path(args.template_file).expanduser().resolve()
         try:
-            with open(template_path, encoding="utf-8") as f:
-                template_content = f.read()
+            template_content = template_path.read_text(encoding="utf-8")
 
             # Validate template has required placeholder
-            if "{body}" not in template_content:
+            if not _has_body_field(template_content):
                 print(
                     "❌ Template file must contain '{body}' placeholder for content insertion",
                     file=sys.stderr,
                 )
                 sys.exit(1)
 
-            # Register as temporary custom template
-            temp_template_name = f"_cli_temp_{abs(hash(str(template_path)))}"
-            register_custom_template(temp_template_name, template_content)
+            # Register as temporary custom template, once per distinct content; the
+            # registry itself is checked so a cleared or replaced registry is refilled
+            # Hashed after newline translation, so line endings do not change the name
+            temp_template_name = _template_name(template_content.encode("utf-8"))
+            if temp_template_name not in list_custom_templates():
+                register_custom_template(temp_template_name, template_content)
             template = temp_template_name
             if args.verbose:
                 print(f"✅ Loaded custom template from: {template_path}")
@@ -137,28 +190,11 @@ def main():
             print(f"❌ Error loading template file '{template_path}': {e!s}", file=sys.stderr)
             sys.exit(1)
     else:
-        # 2. Use match-case instead of dictionary mapping for built-ins
-        match args.template:
-            case "persian" | "farsi" | "rtl" | "fa":
-                template = TemplateType.PERSIAN
-            case "default" | "english" | "ltr" | "en":
-                template = TemplateType.DEFAULT
-            case "minimal" | "simple":
-                template = "minimal"
-            case "plain" | "none":
-                template = TemplateType.PLAIN
-            case _:
-                # Default fallback if args.template is missing or unrecognized
-                template = TemplateType.DEFAULT
+        # Unrecognized names fall back to the English template
+        template = _TEMPLATE_MAP.get(args.template, TemplateType.DEFAULT)
 
     # Process attachments with path expansion
-    attachments = []
-    for attachment in args.attachments:
-        expanded_path = str(Path(attachment).expanduser().resolve())
-        if os.path.exists(expanded_path):
-            attachments.append(expanded_path)
-        else:
-            print(f"⚠️  Warning: Attachment not found: {expanded_path}", file=sys.stderr)
+    attachments = resolve_attachments(args.attachments)
 
     # Send email
     try:
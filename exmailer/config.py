@@ -1,15 +1,81 @@
 """Robust configuration loading with layered priority and validation."""
 
+import importlib.util
 import json
 import logging
 import os
+from collections.abc import Callable
+from functools import cache
 from pathlib import Path
 from typing import Any
 
 from .exceptions import ConfigurationError
+from .utils import json_loads
 
 logger = logging.getLogger(__name__)
 
+# Auto-discovery candidates, in priority order within each search directory.
+# JSON is always probed before YAML: it is far cheaper to parse and needs no extra package.
+_CWD_JSON_NAMES = ("exmailer.json",)
+_CWD_YAML_NAMES = ("exmailer.yaml", "exmailer.yml")
+_USER_JSON_NAMES = ("config.json", "exmailer.json")
+_USER_YAML_NAMES = ("config.yaml", "config.yml", "exmailer.yaml", "exmailer.yml")
+
+_TRUE_VALUES = frozenset({"true", "1", "yes", "on", "y"})
+_FALSE_VALUES = frozenset({"false", "0", "no", "off", "n"})
+# Config files have never accepted the single-letter "y" as true
+_FILE_TRUE_VALUES = _TRUE_VALUES - {"y"}
+
+_KEY_MAPPING = {
+    "domain": ("domain", "exchange_domain", "ad_domain"),
+    "username": ("username", "user", "exchange_user"),
+    "password": ("password", "pass", "exchange_pass"),
+    "server": ("server", "exchange_server", "host"),
+    "email_domain": ("email_domain", "domain_name", "smtp_domain"),
+    "auth_type": ("auth_type", "authentication", "auth"),
+    "save_copy": ("save_copy", "save", "save_sent"),
+}
+_STD_KEYS = frozenset(_KEY_MAPPING)
+_REQUIRED_FIELDS = ("domain", "username", "password", "server", "email_domain")
+# alias -> (standard key, priority of the alias for that key)
+_ALIAS_TO_STD = {
+    alias: (std_key, rank)
+    for std_key, aliases in _KEY_MAPPING.items()
+    for rank, alias in enumerate(aliases)
+}
+
+_EXAMPLE_CONFIG_JSON = json.dumps(
+    {
+        "domain": "your-domain",
+        "username": "john.doe",
+        "password": "your-password",
+        "server": "mail.yourcompany.com",
+        "email_domain": "yourcompany.com",
+        "auth_type": "NTLM",
+        "save_copy": True,
+    },
+    indent=2,
+    ensure_ascii=False,
+)
+# Single %s slot for the comma-separated missing field names
+_MISSING_FIELDS_MESSAGE = (
+    "Missing required configuration fields: %s\n\n"
+    "Provide configuration via one of these methods:\n"
+    "1. Programmatic: ExchangeEmailer(config={...})\n"
+    "2. Config file: ExchangeEmailer(config_path='path/to/config.json')\n"
+    "3. Environment variables (see documentation)\n"
+    "4. Place config.json in current directory or ~/.config/exmailer/\n\n"
+    f"Example config.json:\n{_EXAMPLE_CONFIG_JSON}"
+)
+
+_DOTENV_FILE = ".env"
+
+
+# Resolved path -> ((mtime_ns, size) stamp, normalized contents); one entry per file
+_CONFIG_CACHE: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+# Discovered config file (or None) per working directory
+_DISCOVERY_CACHE: dict[str, Path | None] = {}
+
 
 def load_config(
     config_path: str | None = None,
@@ -24,31 +90,15 @@ def load_config(
     # Layer 3 & 2: Config Files
     if config_path:
         # Explicit file
-        file_config = _load_config_file(config_path)
-        config.update(_normalize_config(file_config))
-        logger.info(f"✓ Loaded configuration from {config_path}")
+        config.update(_load_config_file(config_path))
+        logger.info("✓ Loaded configuration from %s", config_path)
 
     elif not config_dict:
         # Implicit discovery
-        # MOVED HERE: Define paths dynamically to respect os.chdir()
-        default_paths = [
-            Path.cwd() / "exmailer.json",
-            Path.cwd() / "exmailer.yaml",
-            Path.cwd() / "exmailer.yml",
-            Path.home() / ".config" / "exmailer" / "config.json",
-            Path.home() / ".config" / "exmailer" / "exmailer.json",
-            Path.home() / ".config" / "exmailer" / "config.yaml",
-            Path.home() / ".config" / "exmailer" / "config.yml",
-            Path.home() / ".config" / "exmailer" / "exmailer.yaml",
-            Path.home() / ".config" / "exmailer" / "exmailer.yml",
-        ]
-
-        for path in default_paths:
-            if path.exists():
-                file_config = _load_config_file(str(path))
-                config.update(_normalize_config(file_config))
-                logger.info(f"✓ Loaded configuration from discovered file: {path}")
-                break
+        path = _discover_config_path()
+        if path is not None:
+            config.update(_load_config_file(str(path)))
+            logger.info("✓ Loaded configuration from discovered file: %s", path)
 
     # Layer 1: Programmatic config (Highest priority)
     if config_dict:
@@ -76,23 +126,103 @@ def load_config(
     return config
 
 
-def _load_config_file(path: str) -> dict[str, Any] | Any:
-    """Load configuration from JSON or YAML file."""
-    path_obj = Path(path).expanduser().resolve()
+@cache
+def _module_available(name: str) -> bool:
+    """Check once per process whether an optional dependency can be imported."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@cache
+def _user_config_dir() -> Path | None:
+    """Return ~/.config/exmailer, or None when the home directory cannot be determined."""
+    # Home does not change during a process; resolved on first discovery, not at import
+    try:
+        return Path.home() / ".config" / "exmailer"
+    except RuntimeError:  # pragma: no cover
+        return None
+
+
+def _search_dirs() -> list[tuple[Path, tuple[str, ...]]]:
+    """Return auto-discovery directories with their candidate file names, in priority order."""
+    # cwd is resolved on every call to respect os.chdir()
+    cwd_names: tuple[str, ...] = _CWD_JSON_NAMES
+    user_names: tuple[str, ...] = _USER_JSON_NAMES
+    if _module_available("yaml"):
+        cwd_names += _CWD_YAML_NAMES
+        user_names += _USER_YAML_NAMES
 
-    if not path_obj.exists():
-        raise ConfigurationError(f"Config file not found: {path}")
+    search_dirs = [(Path.cwd(), cwd_names)]
+    user_config_dir = _user_config_dir()
+    if user_config_dir is not None:
+        search_dirs.append((user_config_dir, user_names))
+    return search_dirs
+
+
+def _discover_config_path() -> Path | None:
+    """
+    Return the first existing config file from the default locations.
+
+    The result is memoized per working directory; call invalidate_config_cache()
+    after creating or removing config files in a running process.
+    """
+    cwd = os.getcwd()
+    if cwd not in _DISCOVERY_CACHE:
+        _DISCOVERY_CACHE[cwd] = _probe_config_path()
+    return _DISCOVERY_CACHE[cwd]
+
+
+def _probe_config_path() -> Path | None:
+    """Search the default locations for a config file."""
+    for directory, candidates in _search_dirs():
+        for name in candidates:
+            # isfile() also rules out directories that happen to carry a config file name
+            if os.path.isfile(directory / name):
+                return directory / name
+    return None
+
+
+def invalidate_config_cache() -> None:
+    """Drop memoized config files and discovery results so the next load re-reads disk."""
+    _CONFIG_CACHE.clear()
+    _DISCOVERY_CACHE.clear()
+
+
+def _load_config_file(path: str) -> dict[str, Any]:
+    """Load and normalize configuration from a JSON or YAML file, memoized by path and mtime."""
+    path_obj = Path(path).expanduser().resolve()
 
+    try:
+        stat = path_obj.stat()
+    except OSError:
+        raise ConfigurationError(f"Config file not found: {path}") from None
+
+    # Any edit to the file bumps its mtime (or size); the stale entry is replaced, not kept,
+    # so old contents (and passwords) do not pile up in a long-running process
+    key = str(path_obj)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = _CONFIG_CACHE[key] = (stamp, _normalize_config(_parse_config_file(path_obj, path)))
+    # Normalized values are scalars, so a shallow copy isolates callers from the cache
+    return dict(cached[1])
+
+
+def _parse_config_file(path_obj: Path, path: str) -> dict[str, Any] | Any:
+    """Parse a JSON or YAML config file; both parsers decode the raw bytes themselves."""
     try:
         if path_obj.suffix in (".yaml", ".yml"):
             try:
                 import yaml
 
-                with open(path_obj, encoding="utf-8") as f:
-                    content = f.read()
-                    if not content.strip():
-                        return {}
-                    return yaml.safe_load(content) or {}
+                content = path_obj.read_bytes()
+                if not content.strip():
+                    return {}
+                # Prefer the libyaml-backed loader; SafeLoader is the pure-Python fallback
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                return yaml.load(content, Loader=loader) or {}  # noqa: S506
             except ImportError:
                 raise ConfigurationError(  # noqa: B904
                     "YAML support requires 'pyyaml' package. Install with: pip install pyyaml"
@@ -100,12 +230,11 @@ def _load_config_file(path: str) -> dict[str, Any] | Any:
             except Exception as e:
                 raise ConfigurationError(f"Invalid YAML in {path}: {e}")  # noqa: B904
         else:  # JSON (default)
-            with open(path_obj, encoding="utf-8") as f:
-                content = f.read()
-                if not content.strip():
-                    return {}
-                return json.loads(content)
+            return json_loads(path_obj.read_bytes())
     except json.JSONDecodeError as e:
+        # Empty or whitespace-only files fall back to the other config sources
+        if not e.doc.strip():
+            return {}
         raise ConfigurationError(f"Invalid JSON in {path}: {e}")  # noqa: B904
     except Exception as e:
         raise ConfigurationError(f"Failed to parse config file {path}: {e}")  # noqa: B904
@@ -113,63 +242,80 @@ def _load_config_file(path: str) -> dict[str, Any] | Any:
 
 def _load_env_config() -> dict[str, Any]:
     """Load configuration from environment variables."""
-    try:
-        from dotenv import load_dotenv
-
-        load_dotenv()
-    except ImportError:
-        pass
+    _load_dotenv()
 
+    # Read live (no snapshot) so variables set at runtime are always honoured
+    getenv = os.environ.get
     return {
-        "domain": os.getenv("EXCHANGE_DOMAIN"),
-        "username": os.getenv("EXCHANGE_USER"),
-        "password": os.getenv("EXCHANGE_PASS"),
-        "server": os.getenv("EXCHANGE_SERVER"),
-        "email_domain": os.getenv("EXCHANGE_EMAIL_DOMAIN"),
-        "auth_type": os.getenv("EXCHANGE_AUTH_TYPE"),
-        "save_copy": _parse_bool_env("EXCHANGE_SAVE_COPY"),
+        key: parse(value) if (value := getenv(env_name)) is not None else None
+        for key, env_name, parse in _ENV_SPEC
     }
 
 
-def _parse_bool_env(var_name: str) -> bool | None:
-    """Parse boolean environment variable."""
-    value = os.getenv(var_name)
-    if value is None:
-        return None
-    value_lower = value.lower()
-    if value_lower in ("true", "1", "yes", "on", "y"):
+def _load_dotenv() -> None:
+    """Load ./.env into the environment, importing python-dotenv only when the file exists."""
+    if not _module_available("dotenv") or not os.path.isfile(_DOTENV_FILE):
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=_DOTENV_FILE)
+
+
+def _parse_bool_value(value: str) -> bool | None:
+    """Parse a boolean environment value; unrecognized values yield None."""
+    value = value.lower()
+    if value in _TRUE_VALUES:
         return True
-    if value_lower in ("false", "0", "no", "off", "n"):
+    if value in _FALSE_VALUES:
         return False
     return None
 
 
+# (standard key, environment variable, parser) for each env-configurable setting
+_ENV_SPEC: tuple[tuple[str, str, Callable[[str], Any]], ...] = (
+    ("domain", "EXCHANGE_DOMAIN", str),
+    ("username", "EXCHANGE_USER", str),
+    ("password", "EXCHANGE_PASS", str),
+    ("server", "EXCHANGE_SERVER", str),
+    ("email_domain", "EXCHANGE_EMAIL_DOMAIN", str),
+    ("auth_type", "EXCHANGE_AUTH_TYPE", str),
+    ("save_copy", "EXCHANGE_SAVE_COPY", _parse_bool_value),
+)
+
+
 def _normalize_config(config: dict[str, Any]) -> dict[str, Any]:
-    """Normalize config keys to standard names and types."""
+    """
+    Normalize config keys to standard names and types.
+
+    Already-canonical input with a boolean (or absent) save_copy is returned as-is,
+    so callers must copy before mutating the result.
+    """
     if not isinstance(config, dict):
         raise ConfigurationError(f"Invalid configuration: expected dict, got {type(config)}")
 
-    normalized = {}
-    key_mapping = {
-        "domain": ["domain", "exchange_domain", "ad_domain"],
-        "username": ["username", "user", "exchange_user"],
-        "password": ["password", "pass", "exchange_pass"],
-        "server": ["server", "exchange_server", "host"],
-        "email_domain": ["email_domain", "domain_name", "smtp_domain"],
-        "auth_type": ["auth_type", "authentication", "auth"],
-        "save_copy": ["save_copy", "save", "save_sent"],
-    }
-
-    for std_key, aliases in key_mapping.items():
-        for alias in aliases:
-            if alias in config:
-                normalized[std_key] = config[alias]
-                break
+    if config.keys() <= _STD_KEYS:
+        # Already canonical (the documented programmatic form): no alias resolution needed
+        if isinstance(config.get("save_copy", False), bool):
+            return config
+        normalized = dict(config)
+    else:
+        normalized = {}
+        ranks: dict[str, int] = {}
+        for key, value in config.items():
+            match = _ALIAS_TO_STD.get(key)
+            if match is None:
+                continue
+            std_key, rank = match
+            # Earlier aliases in _KEY_MAPPING win when several are present
+            if std_key not in ranks or rank < ranks[std_key]:
+                normalized[std_key] = value
+                ranks[std_key] = rank
 
     if "save_copy" in normalized:
         val = normalized["save_copy"]
         if isinstance(val, str):
-            normalized["save_copy"] = val.lower() in ("true", "1", "yes", "on")
+            normalized["save_copy"] = val.lower() in _FILE_TRUE_VALUES
         elif not isinstance(val, bool):
             normalized["save_copy"] = bool(val)
 
@@ -178,35 +324,15 @@ def _normalize_config(config: dict[str, Any]) -> dict[str, Any]:
 
 def _validate_required_fields(config: dict[str, Any]) -> None:
     """Validate that all required fields are present and non-empty."""
-    required_fields = ["domain", "username", "password", "server", "email_domain"]
-    missing = []
-
-    for field in required_fields:
-        val = config.get(field)
-        # Check for None or empty string or whitespace-only string
-        if not val or (isinstance(val, str) and not val.strip()):
-            missing.append(field)
+    # Check for None or empty string or whitespace-only string
+    missing = [
+        field
+        for field in _REQUIRED_FIELDS
+        if not (val := config.get(field)) or (type(val) is str and not val.strip())
+    ]
 
     if missing:
-        example_config = {
-            "domain": "your-domain",
-            "username": "john.doe",
-            "password": "your-password",
-            "server": "mail.yourcompany.com",
-            "email_domain": "yourcompany.com",
-            "auth_type": "NTLM",
-            "save_copy": True,
-        }
-
-        raise ConfigurationError(
-            f"Missing required configuration fields: {', '.join(missing)}\n\n"
-            "Provide configuration via one of these methods:\n"
-            "1. Programmatic: ExchangeEmailer(config={...})\n"
-            "2. Config file: ExchangeEmailer(config_path='path/to/config.json')\n"
-            "3. Environment variables (see documentation)\n"
-            "4. Place config.json in current directory or ~/.config/exmailer/\n\n"
-            f"Example config.json:\n{json.dumps(example_config, indent=2, ensure_ascii=False)}"
-        )
+        raise ConfigurationError(_MISSING_FIELDS_MESSAGE % ", ".join(missing))
 
     valid_auth_types = ["NTLM", "BASIC"]
     if config["auth_type"] and config["auth_type"].upper() not in valid_auth_types:
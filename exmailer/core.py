@@ -1,64 +1,105 @@
 """Core ExchangeEmailer class with flexible template system."""
 
 import datetime
+import functools
+import importlib
 import logging
-import ssl
-from collections.abc import Sequence
-from typing import Any, Literal
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Literal
 from zoneinfo import ZoneInfo
 
-from exchangelib import (
-    DELEGATE,
-    Account,
-    Build,
-    CalendarItem,
-    Configuration,
-    Credentials,
-    FileAttachment,
-    HTMLBody,
-    Mailbox,
-    Message,
-    Version,
-)
-from exchangelib.errors import TransportError, UnauthorizedError
-from exchangelib.protocol import BaseProtocol
-from requests.adapters import HTTPAdapter
-from urllib3.poolmanager import PoolManager
-
 from .config import load_config
 from .exceptions import (
     AuthenticationError,
     ExchangeEmailConnectionError,
     SendError,
 )
-from .templates import TemplateType, get_template
+from .templates import TemplateType, compile_template, get_template
 from .utils import validate_attachments
 
+if TYPE_CHECKING:
+    from exchangelib import (
+        DELEGATE,
+        Account,
+        Build,
+        CalendarItem,
+        Configuration,
+        Credentials,
+        FileAttachment,
+        HTMLBody,
+        Mailbox,
+        Message,
+        Version,
+    )
+    from exchangelib.errors import TransportError, UnauthorizedError
+    from exchangelib.protocol import BaseProtocol
+
+    from .transport import SecureHTTPAdapter, _shared_ssl_context
+
 logger = logging.getLogger(__name__)
 
+# exchangelib and requests take a few hundred milliseconds to import, so these names
+# are bound into the module on first use (see _load_lazy_names) rather than at
+# import time
+_LAZY_NAMES = {
+    "DELEGATE": "exchangelib",
+    "Account": "exchangelib",
+    "Build": "exchangelib",
+    "CalendarItem": "exchangelib",
+    "Configuration": "exchangelib",
+    "Credentials": "exchangelib",
+    "FileAttachment": "exchangelib",
+    "HTMLBody": "exchangelib",
+    "Mailbox": "exchangelib",
+    "Message": "exchangelib",
+    "Version": "exchangelib",
+    "TransportError": "exchangelib.errors",
+    "UnauthorizedError": "exchangelib.errors",
+    "BaseProtocol": "exchangelib.protocol",
+    "SecureHTTPAdapter": ".transport",
+    "_shared_ssl_context": ".transport",
+}
 
-class SecureHTTPAdapter(HTTPAdapter):
-    """
-    Custom HTTP Adapter that injects a secure SSL context.
-    Compatible with exchangelib which instantiates adapters without args.
-    """
 
-    def __init__(self, ssl_context: ssl.SSLContext | None = None, **kwargs):
-        if ssl_context is None:  # pragma: no cover
-            ssl_context = ssl.create_default_context()
-            ssl_context.load_default_certs()
+def _load_lazy_names() -> None:
+    """Import exchangelib and the transport, binding their names here unless already set."""
+    module_globals = globals()
+    for name, module_name in _LAZY_NAMES.items():
+        if name not in module_globals:
+            module = importlib.import_module(module_name, __package__)
+            module_globals[name] = getattr(module, name)
 
-        self.ssl_context = ssl_context
-        super().__init__(**kwargs)
 
-    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
-        self.poolmanager = PoolManager(
-            num_pools=connections,
-            maxsize=maxsize,
-            block=block,
-            ssl_context=self.ssl_context,
-            **pool_kwargs,
-        )
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_NAMES:
+        _load_lazy_names()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.cache
+def _exchange_version() -> "Version":
+    """Return the pinned Exchange server version (15.1.2248), built once per process."""
+    return Version(build=Build(15, 1, 2248, 0))
+
+
+def _to_mailboxes(addresses: Sequence[str] | None) -> list["Mailbox"]:
+    """Wrap email addresses in fresh exchangelib Mailbox objects."""
+    # Mailbox is a mutable EWSElement (clean() writes back onto it), so never share one
+    return [Mailbox(email_address=address) for address in addresses or ()]
+
+
+class _LazyJoin:
+    """Join strings only when rendered, so disabled log records never build the list."""
+
+    __slots__ = ("items", "sep")
+
+    def __init__(self, items: Sequence[str], sep: str = ", "):
+        self.items = items
+        self.sep = sep
+
+    def __str__(self) -> str:
+        return self.sep.join(self.items)
 
 
 class ExchangeEmailer:
@@ -102,6 +143,7 @@ class ExchangeEmailer:
         """
         self.verbose = verbose
         self.config = load_config(config_path=config_path, config_dict=config)
+        _load_lazy_names()
         self._patch_exchangelib_adapter()
 
         if verbose:  # pragma: no cover
@@ -117,30 +159,24 @@ class ExchangeEmailer:
         """
         Configure exchangelib to use our SecureHTTPAdapter.
         This ensures all connections use system SSL certificates.
+
+        exchangelib mounts one adapter per pooled session on the EWS endpoint, and
+        those sessions are reused (keep-alive) across requests, so this class-level
+        hook is the only place the adapter needs to be set.
         """
         if BaseProtocol.HTTP_ADAPTER_CLS != SecureHTTPAdapter:
             BaseProtocol.HTTP_ADAPTER_CLS = SecureHTTPAdapter
             logger.debug("🔒 Patched exchangelib with SecureHTTPAdapter")
 
-    def _create_ssl_context(self) -> ssl.SSLContext:
-        """Create a secure SSL context using standard libraries."""
-        try:
-            ctx = ssl.create_default_context()
-            ctx.load_default_certs()
-            logger.info("✅ SSL configured with system certificates")
-            return ctx
-        except Exception as e:  # pragma: no cover
-            logger.warning(f"⚠️ SSL configuration failed: {e!s}")
-            # noqa S323 - intentional fallback for connectivity resilience
-            return ssl._create_unverified_context()  # noqa: S323
+        # Build the shared context now, on this thread, rather than during the first
+        # request where exchangelib worker threads could race to create it
+        _shared_ssl_context()
 
     def _connect_to_exchange(self):
         """Connect to Exchange server with provided credentials."""
         try:
             full_username = f"{self.config['domain']}\\{self.config['username']}"
             credentials = Credentials(username=full_username, password=self.config["password"])
-            version = Version(build=Build(15, 1, 2248, 0))
-
             email_domain = self.config.get("email_domain")
             if email_domain is None:  # pragma: no cover
                 raise ValueError("`email_domain` must be configured!")
@@ -150,7 +186,7 @@ class ExchangeEmailer:
                 service_endpoint=f"https://{self.config['server']}/EWS/Exchange.asmx",
                 credentials=credentials,
                 auth_type=self.config["auth_type"],
-                version=version,
+                version=_exchange_version(),
             )
 
             account = Account(
@@ -160,15 +196,6 @@ class ExchangeEmailer:
                 access_type=DELEGATE,
             )
 
-            # Inject Secure Adapter directly into this account's session
-            if account.protocol:
-                ssl_context = self._create_ssl_context()
-                adapter = SecureHTTPAdapter(ssl_context=ssl_context)
-
-                session = account.protocol.get_session()
-                session.mount("https://", adapter)
-                account.protocol.release_session(session)
-
             if self.verbose:  # pragma: no cover
                 print("✅ Connected to Exchange Server")
             logger.info("Successfully connected to Exchange Server")
@@ -185,14 +212,21 @@ class ExchangeEmailer:
         self, body: str, template: str | TemplateType | None, template_vars: dict[str, Any] | None
     ) -> str:
         """Helper method to share template rendering between Emails and Calendar Invites."""
-        template_vars = template_vars or {}
-        template_vars["body"] = body.format(**template_vars)
+        values = template_vars or {}
+        # Bodies are usually unique (and may be large or sensitive), so they are formatted
+        # directly rather than kept in the compiled-template cache, which is for templates
+        resolved_body = body.format_map(values)
 
         if template is None or template == TemplateType.PLAIN:
-            return body.format(**template_vars)
+            return resolved_body
 
         template_html = get_template(template)
-        return template_html.format(**template_vars)
+        if template_html == "{body}":
+            # Plain aliases such as "none" (or a pass-through custom template) add no wrapper
+            return resolved_body
+
+        # Copy so the caller's dict (or a shared argparse default) is never mutated
+        return compile_template(template_html)({**values, "body": resolved_body})
 
     def _ensure_timezone(self, dt: datetime.datetime) -> datetime.datetime:
         """Ensure the datetime is timezone aware to prevent Exchange Server rejection."""
@@ -202,6 +236,54 @@ class ExchangeEmailer:
             return dt.replace(tzinfo=ZoneInfo(fallback_tz))
         return dt
 
+    def _build_message(
+        self,
+        subject: str,
+        body: str,
+        recipients: Sequence[str],
+        attachments: Sequence[str] | None = None,
+        cc_recipients: Sequence[str] | None = None,
+        bcc_recipients: Sequence[str] | None = None,
+        template: str | TemplateType | None = TemplateType.PERSIAN,
+        template_vars: dict[str, Any] | None = None,
+        importance: Literal["Low", "Normal", "High"] = "Normal",
+    ) -> "Message":
+        """Render the body and build an unsent Message with its attachments."""
+        formatted_body = self._render_body(body, template, template_vars)
+
+        msg = Message(
+            account=self.account,
+            subject=subject,
+            body=HTMLBody(formatted_body),
+            to_recipients=_to_mailboxes(recipients),
+            cc_recipients=_to_mailboxes(cc_recipients),
+            bcc_recipients=_to_mailboxes(bcc_recipients),
+            importance=importance,
+        )
+
+        # Process attachments
+        if attachments:
+            validated_attachments = validate_attachments(attachments)
+            for attachment in validated_attachments:
+                try:
+                    # validate_attachments already read the file; don't read it again
+                    file_attachment = FileAttachment(
+                        name=attachment["name"],
+                        content=attachment["content"],
+                        content_type=attachment["content_type"],
+                    )
+                    msg.attach(file_attachment)
+                    logger.info(
+                        "Attached: %s (%d KB)", attachment["name"], attachment["size"] // 1024
+                    )
+
+                except Exception as e:  # pragma: no cover
+                    logger.error("Failed to attach %s: %s", attachment["path"], e)
+                    if self.verbose:
+                        print(f"⚠️ Failed to attach {attachment['path']}: {e!s}")
+
+        return msg
+
     def send_email(
         self,
         subject: str,
@@ -269,48 +351,18 @@ class ExchangeEmailer:
             ... )
         """
         try:
-            # Get the appropriate template
-            ## Apply template variables if provided
-            formatted_body = self._render_body(body, template, template_vars)
-
-            # Create message
-            msg = Message(
-                account=self.account,
+            msg = self._build_message(
                 subject=subject,
-                body=HTMLBody(formatted_body),
-                to_recipients=[Mailbox(email_address=email) for email in recipients],
-                cc_recipients=(
-                    [Mailbox(email_address=e) for e in cc_recipients] if cc_recipients else []
-                ),
-                bcc_recipients=(
-                    [Mailbox(email_address=e) for e in bcc_recipients] if bcc_recipients else []
-                ),
+                body=body,
+                recipients=recipients,
+                attachments=attachments,
+                cc_recipients=cc_recipients,
+                bcc_recipients=bcc_recipients,
+                template=template,
+                template_vars=template_vars,
                 importance=importance,
             )
 
-            # Process attachments
-            if attachments:
-                validated_attachments = validate_attachments(attachments)
-                for attachment in validated_attachments:
-                    try:
-                        with open(attachment["path"], "rb") as f:
-                            content = f.read()
-
-                        file_attachment = FileAttachment(
-                            name=attachment["name"],
-                            content=content,
-                            content_type=attachment["content_type"],
-                        )
-                        msg.attach(file_attachment)
-                        logger.info(
-                            f"Attached: {attachment['name']} ({attachment['size'] // 1024} KB)"
-                        )
-
-                    except Exception as e:  # pragma: no cover
-                        logger.error(f"Failed to attach {attachment['path']}: {e!s}")
-                        if self.verbose:
-                            print(f"⚠️ Failed to attach {attachment['path']}: {e!s}")
-
             # Send email
             save_copy = self.config.get("save_copy", True)
             try:
@@ -318,18 +370,75 @@ class ExchangeEmailer:
             except Exception as e:
                 raise SendError(f"Failed to send email: {e!s}") from e  # ← Wrap exception
 
-            logger.info(f"✅ Email sent successfully to {', '.join(recipients)}")
+            logger.info("✅ Email sent successfully to %s", _LazyJoin(recipients))
             if self.verbose:  # pragma: no cover
-                print(f"✅ Email sent successfully to {', '.join(recipients)}")
+                print(f"✅ Email sent successfully to {_LazyJoin(recipients)}")
 
             return True
 
         except Exception as e:
-            logger.error(f"❌ Failed to send email: {e!s}")
+            logger.error("❌ Failed to send email: %s", e)
             if self.verbose:  # pragma: no cover
                 print(f"❌ Failed to send email: {e!s}")
             raise
 
+    def send_many(
+        self, messages: Iterable[Mapping[str, Any]], batch_size: int | None = None
+    ) -> list[bool]:
+        """
+        Send several emails in a single Exchange request.
+
+        Each item holds the keyword arguments accepted by send_email(). All messages
+        are built first and then posted together with one bulk CreateItem call,
+        instead of one round trip per email.
+
+        Args:
+            messages: Iterable of send_email() keyword-argument mappings
+            batch_size: Maximum messages per CreateItem request; larger inputs are
+                split into several requests (default: exchangelib's chunk size)
+
+        Returns:
+            List with one entry per message: True if it was sent, False if Exchange
+            rejected it
+
+        Raises:
+            SendError: If the bulk request itself fails
+
+        Examples:
+            >>> emailer.send_many([
+            ...     {"subject": "Hi", "body": "First", "recipients": ["a@example.com"]},
+            ...     {"subject": "Hi", "body": "Second", "recipients": ["b@example.com"]},
+            ... ])
+            [True, True]
+        """
+        msgs = [self._build_message(**message) for message in messages]
+        if not msgs:
+            return []
+
+        # EWS only accepts a saved-item folder when a copy is kept
+        if self.config.get("save_copy", True):
+            folder, disposition = self.account.sent, "SendAndSaveCopy"
+        else:
+            folder, disposition = None, "SendOnly"
+
+        try:
+            results = self.account.bulk_create(
+                folder=folder, items=msgs, message_disposition=disposition, chunk_size=batch_size
+            )
+        except Exception as e:
+            logger.error("❌ Failed to send %d emails: %s", len(msgs), e)
+            raise SendError(f"Failed to send emails: {e!s}") from e
+
+        sent = []
+        for msg, result in zip(msgs, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error("❌ Failed to send email '%s': %s", msg.subject, result)
+                sent.append(False)
+            else:
+                sent.append(True)
+        logger.info("✅ Sent %d/%d emails in one request", sum(sent), len(msgs))
+        return sent
+
     # ==========================================
     # CALENDAR / MEETING METHODS
     # ==========================================
@@ -389,11 +498,11 @@ class ExchangeEmailer:
             )
 
             item.save(send_meeting_invitations="SendToAllAndSaveCopy")
-            logger.info(f"✅ Meeting '{subject}' created successfully.")
+            logger.info("✅ Meeting '%s' created successfully.", subject)
             return item.id  # type: ignore
 
         except Exception as e:
-            logger.error(f"❌ Failed to create meeting invite: {e!s}")
+            logger.error("❌ Failed to create meeting invite: %s", e)
             raise SendError(f"Failed to create meeting: {e!s}") from e
 
     def update_meeting_invite(
@@ -469,7 +578,7 @@ class ExchangeEmailer:
 
             # 5. Commit and Transmit
             item.save(send_meeting_invitations=dispatch_mode)
-            logger.info(f"✅ Meeting '{subject}' updated successfully. Mode: {dispatch_mode}")
+            logger.info("✅ Meeting '%s' updated successfully. Mode: %s", subject, dispatch_mode)
             return True
 
         except ValueError:
@@ -477,7 +586,7 @@ class ExchangeEmailer:
             raise
         except Exception as error:
             # Broad catch mapped to specific domain exception
-            logger.error(f"❌ Failed to update meeting {exchange_id}: {error!s}")
+            logger.error("❌ Failed to update meeting %s: %s", exchange_id, error)
             raise SendError(f"Failed to update meeting: {error!s}") from error
 
     def cancel_meeting_invite(self, exchange_id: str) -> bool:
@@ -500,16 +609,29 @@ class ExchangeEmailer:
         try:
             item = self.account.calendar.get(id=exchange_id)
             item.delete(send_meeting_cancellations="SendToAllAndSaveCopy")
-            logger.info(f"✅ Meeting {exchange_id} canceled successfully.")
+            logger.info("✅ Meeting %s canceled successfully.", exchange_id)
             return True
 
         except Exception as e:
-            logger.error(f"❌ Failed to cancel meeting {exchange_id}: {e!s}")
+            logger.error("❌ Failed to cancel meeting %s: %s", exchange_id, e)
             raise SendError(f"Failed to cancel meeting: {e!s}") from e
 
-    def __enter__(self):  # pragma: no cover
+    def close(self) -> None:
+        """
+        Close the pooled Exchange HTTP sessions and their TLS connections.
+
+        exchangelib re-creates sessions on demand, so a closed emailer (or another
+        one sharing the same server and credentials) can still send afterwards.
+        """
+        self.account.protocol.close()
+        logger.debug("Closed Exchange sessions")
+
+    def __enter__(self):
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):  # pragma: no cover
-        # Cleanup resources if needed
-        pass
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # A failing close must never replace the exception raised inside the with-block
+        try:
+            self.close()
+        except Exception:
+            logger.warning("Failed to close Exchange sessions", exc_info=True)
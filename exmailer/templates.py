@@ -1,6 +1,11 @@
 """HTML email templates with flexible template management."""
 
+import re
+from collections.abc import Callable, Mapping
 from enum import StrEnum
+from functools import lru_cache
+from string import Formatter
+from typing import Any
 
 
 class TemplateType(StrEnum):
@@ -36,12 +41,21 @@ def register_custom_template(name: str, template_html: str) -> None:
         ... '''
         >>> register_custom_template("my_newsletter", my_template)
     """
-    if "{body}" not in template_html:
+    if not _has_body_field(template_html):
         raise ValueError("Template must contain {body} placeholder")
 
     _custom_templates[name] = template_html
 
 
+def _has_body_field(template_html: str) -> bool:
+    """Check for a real {body} format field, as str.format sees it ({{body}} is a literal)."""
+    try:
+        return any(field == "body" for _, field, _, _ in Formatter().parse(template_html))
+    except ValueError:
+        # Malformed format strings (e.g. a lone "{") cannot be rendered at all
+        return False
+
+
 def get_custom_template(name: str) -> str:
     """
     Get a registered custom template.
@@ -68,14 +82,8 @@ def list_custom_templates() -> list[str]:
     return list(_custom_templates.keys())
 
 
-def get_persian_template() -> str:
-    """
-    Return Persian (Farsi) RTL email template.
-
-    Returns:
-        HTML template string with RTL support
-    """
-    return """
+# Built-in template sources; the getters hand out the minified constants below
+_PERSIAN_SOURCE = """
 <!DOCTYPE html>
 <html dir="rtl" lang="fa">
 <head>
@@ -135,15 +143,7 @@ def get_persian_template() -> str:
 </html>
 """
 
-
-def get_default_template() -> str:
-    """
-    Return default English LTR email template.
-
-    Returns:
-        HTML template string with LTR support
-    """
-    return """
+_DEFAULT_SOURCE = """
         <!DOCTYPE html>
         <html lang="en">
         <head>
@@ -203,15 +203,7 @@ def get_default_template() -> str:
         </html>
         """
 
-
-def get_minimal_template() -> str:
-    """
-    Return a minimal template with basic styling.
-
-    Returns:
-        Minimal HTML template string
-    """
-    return """
+_MINIMAL_SOURCE = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -232,6 +224,70 @@ def get_minimal_template() -> str:
         """
 
 
+# Whitespace runs that contain a line break, between two tags or anywhere else
+_BETWEEN_TAGS_WS = re.compile(r">\s*\n\s*<")
+_LINE_BREAK_WS = re.compile(r"\s*\n\s*")
+
+
+def _minify_html(html: str) -> str:
+    """Drop source indentation from a built-in template; text on a single line is untouched."""
+    html = _BETWEEN_TAGS_WS.sub("><", html.strip())
+    return _LINE_BREAK_WS.sub(" ", html)
+
+
+# Shipped minified: the indentation is never rendered but was sent with every email
+_PERSIAN_HTML = _minify_html(_PERSIAN_SOURCE)
+_DEFAULT_HTML = _minify_html(_DEFAULT_SOURCE)
+_MINIMAL_HTML = _minify_html(_MINIMAL_SOURCE)
+_PLAIN_HTML = "{body}"  # No template
+
+# Lower-cased built-in template names and aliases
+_BUILTIN_TEMPLATES: dict[str, str] = {
+    "persian": _PERSIAN_HTML,
+    "farsi": _PERSIAN_HTML,
+    "rtl": _PERSIAN_HTML,
+    "fa": _PERSIAN_HTML,
+    "default": _DEFAULT_HTML,
+    "english": _DEFAULT_HTML,
+    "ltr": _DEFAULT_HTML,
+    "en": _DEFAULT_HTML,
+    "minimal": _MINIMAL_HTML,
+    "simple": _MINIMAL_HTML,
+    "plain": _PLAIN_HTML,
+    "none": _PLAIN_HTML,
+}
+
+
+def get_persian_template() -> str:
+    """
+    Return Persian (Farsi) RTL email template.
+
+    Returns:
+        HTML template string with RTL support
+    """
+    return _PERSIAN_HTML
+
+
+def get_default_template() -> str:
+    """
+    Return default English LTR email template.
+
+    Returns:
+        HTML template string with LTR support
+    """
+    return _DEFAULT_HTML
+
+
+def get_minimal_template() -> str:
+    """
+    Return a minimal template with basic styling.
+
+    Returns:
+        Minimal HTML template string
+    """
+    return _MINIMAL_HTML
+
+
 def get_template(template: str | TemplateType) -> str:
     """
     Get template HTML by name or type.
@@ -256,32 +312,59 @@ def get_template(template: str | TemplateType) -> str:
         >>> # Using custom template name
         >>> get_template("my_custom_template")
     """
-    # Handle TemplateType enum
-    match template:
-        # Handle TemplateType enum directly
-        case TemplateType.PERSIAN:
-            return get_persian_template()
-        case TemplateType.DEFAULT:
-            return get_default_template()
-        case TemplateType.PLAIN:
-            return "{body}"  # No template
-
-        # Match if it's a string, and bind it to 't_str'
-        case str() as t_str:
-            # Nested match on the lowercased string using the OR (|) operator
-            match t_str.lower():
-                case "persian" | "farsi" | "rtl" | "fa":
-                    return get_persian_template()
-                case "default" | "english" | "ltr" | "en":
-                    return get_default_template()
-                case "minimal" | "simple":
-                    return get_minimal_template()
-                case "plain" | "none":
-                    return "{body}"
-                case _:
-                    # Try to get custom template if no built-in matches
-                    return get_custom_template(t_str)
-
-        # Fallback for unexpected types
-        case _:
-            raise ValueError(f"Invalid template type/name: {template}")
+    if not isinstance(template, str):
+        raise ValueError(f"Invalid template type/name: {template}")
+
+    # TemplateType members are str values, so they resolve through the same table;
+    # exact (already lower-case) names hit without allocating a case-folded copy
+    builtin = _BUILTIN_TEMPLATES.get(template) or _BUILTIN_TEMPLATES.get(template.casefold())
+    if builtin is not None:
+        return builtin
+
+    # Try to get custom template if no built-in matches
+    return get_custom_template(template)
+
+
+@lru_cache(maxsize=64)
+def compile_template(template_html: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Pre-parse a template's format fields into a reusable renderer.
+
+    Templates that only use plain ``{name}`` fields render by joining precomputed
+    literal chunks, so the format string (and its ``{{ }}`` escapes) is not re-parsed
+    for every email. Templates using positional fields, attribute/index access,
+    conversions or format specs fall back to ``str.format_map``.
+
+    Args:
+        template_html: Template string in ``str.format`` syntax
+
+    Returns:
+        Callable taking the template variables and returning the rendered string
+    """
+    chunks: list[tuple[str, str | None]] = []
+    for literal, field, spec, conversion in Formatter().parse(template_html):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return template_html.format_map
+        chunks.append((literal, field))
+
+    fields = [field for _, field in chunks if field is not None]
+    if fields == ["body"]:
+        # Common case (all built-ins): the template splits once around {body}
+        split = next(i for i, (_, field) in enumerate(chunks) if field is not None) + 1
+        prefix = "".join(literal for literal, _ in chunks[:split])
+        suffix = "".join(literal for literal, _ in chunks[split:])
+
+        def render_body(values: Mapping[str, Any]) -> str:
+            return "".join((prefix, format(values["body"]), suffix))
+
+        return render_body
+
+    def render(values: Mapping[str, Any]) -> str:
+        parts = []
+        for literal, field in chunks:
+            parts.append(literal)
+            if field is not None:
+                parts.append(format(values[field]))
+        return "".join(parts)
+
+    return render
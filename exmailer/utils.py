@@ -1,15 +1,29 @@
+import json
 import logging
 import os
+import stat
 from collections.abc import (
+    Callable,
     Iterator,
     Sequence,
 )
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, TypedDict
+
+# orjson is an optional, faster drop-in for json.loads (accepts str or bytes,
+# raises a json.JSONDecodeError subclass)
+try:
+    import orjson
+
+    json_loads: Callable[[str | bytes], Any] = orjson.loads
+except ImportError:  # pragma: no cover
+    json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
 MAX_ATTACHMENT_SIZE = 25 * 1024 * 1024  # 25MB Exchange limit
+MAX_READ_WORKERS = 8  # Concurrent attachment reads
 
 
 class AttachmentData(TypedDict):
@@ -20,31 +34,85 @@ class AttachmentData(TypedDict):
     path: Path
 
 
+# MIME types for common corporate files, keyed by lower-case extension
+_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".zip": "application/zip",
+    ".txt": "text/plain",
+    ".csv": "text/csv",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".rtf": "application/rtf",
+    ".msg": "application/vnd.ms-outlook",
+}
+
+
 def get_content_type(filename: str) -> str:
     """Map file extensions to MIME types for common corporate files."""
-    extensions = {
-        ".pdf": "application/pdf",
-        ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        ".xls": "application/vnd.ms-excel",
-        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ".doc": "application/msword",
-        ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        ".zip": "application/zip",
-        ".txt": "text/plain",
-        ".csv": "text/csv",
-        ".jpg": "image/jpeg",
-        ".png": "image/png",
-        ".rtf": "application/rtf",
-        ".msg": "application/vnd.ms-outlook",
-    }
-    ext = os.path.splitext(filename.lower())[1]
-    return extensions.get(ext, "application/octet-stream")
+    # Lower-case only the extension, not the whole name
+    ext = os.path.splitext(filename)[1].lower()
+    return _CONTENT_TYPES.get(ext, "application/octet-stream")
+
+
+def _load_attachment(path_str: str) -> AttachmentData | None:
+    """Resolve, check and read one attachment; return None (after logging) if it is skipped."""
+    try:
+        path = Path(os.path.realpath(os.path.expanduser(path_str)))
+
+        # One stat() answers both "is it a regular file?" and "how big is it?"
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            st = None
+
+        # Reject directories or missing files
+        if st is None or not stat.S_ISREG(st.st_mode):
+            logger.warning("Skipping missing or invalid file: %s", path_str)
+            return None
+
+        # Explicitly convert size to int to prevent mock leakage
+        size = int(st.st_size)
+
+        if size == 0:
+            logger.warning("Skipping empty file: %s", path_str)
+            return None
+
+        if size > MAX_ATTACHMENT_SIZE:
+            logger.warning(
+                "Attachment %s is %.1fMB (exceeds %sMB limit). Might be rejected by Exchange server.",
+                path.name,
+                size / 1024 / 1024,
+                MAX_ATTACHMENT_SIZE / 1024 / 1024,
+            )
+
+        return AttachmentData(
+            name=path.name,
+            content=path.read_bytes(),
+            content_type=get_content_type(path.name),
+            size=size,
+            path=path,
+        )
+
+    except PermissionError:
+        logger.error("Permission denied when accessing attachment: %s", path_str)
+    except OSError as e:
+        logger.error("I/O error processing attachment %s: %s", path_str, e)
+    return None
 
 
 def validate_attachments(attachment_paths: Sequence[str] | None) -> Iterator[AttachmentData]:
     """
     Validate and prepare attachments for sending.
 
+    Each file is resolved, stat-ed and read on a small thread pool so that several
+    attachments on slow or network storage overlap their I/O; results are still
+    yielded in the original order.
+
     Args:
         attachment_paths: A sequence (list, tuple) of file paths to attach.
 
@@ -54,43 +122,7 @@ def validate_attachments(attachment_paths: Sequence[str] | None) -> Iterator[Att
     if not attachment_paths:
         return
 
-    for path_str in attachment_paths:
-        try:
-            path = Path(path_str).expanduser().resolve()
-
-            # Reject directories or missing files
-            if not path.is_file():
-                logger.warning(f"Skipping missing or invalid file: {path_str}")
-                continue
-
-            # Explicitly convert size to int to prevent mock leakage
-            size = int(path.stat().st_size)
-
-            if size == 0:
-                logger.warning(f"Skipping empty file: {path_str}")
-                continue
-
-            if size > MAX_ATTACHMENT_SIZE:
-                logger.warning(
-                    f"Attachment {path.name} is {size / 1024 / 1024:.1f}MB "
-                    f"(exceeds {MAX_ATTACHMENT_SIZE / 1024 / 1024}MB limit). "
-                    "Might be rejected by Exchange server."
-                )
-
-            content_type = get_content_type(path.name)
-
-            with open(path, "rb") as f:
-                content = f.read()
-
-            yield AttachmentData(
-                name=path.name,
-                content=content,
-                content_type=content_type,
-                size=size,
-                path=path,
-            )
-
-        except PermissionError:
-            logger.error(f"Permission denied when accessing attachment: {path_str}")
-        except OSError as e:
-            logger.error(f"I/O error processing attachment {path_str}: {e}")
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(attachment_paths))) as pool:
+        for attachment in pool.map(_load_attachment, attachment_paths):
+            if attachment is not None:
+                yield attachment
@@ -6,6 +6,11 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from exchangelib import Account, Configuration, Credentials
+from exchangelib.protocol import BaseProtocol
+
+from exmailer.config import invalidate_config_cache
+from exmailer.core import ExchangeEmailer
+from exmailer.transport import _verified_ssl_context
 
 
 @pytest.fixture(autouse=True)
@@ -20,11 +25,27 @@ def clean_environment():
     os.environ.update(original_env)
 
 
+@pytest.fixture(autouse=True)
+def clean_config_cache():
+    """Start each test with empty config file and discovery caches."""
+    invalidate_config_cache()
+    yield
+    invalidate_config_cache()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def restore_http_adapter_cls():
+    """Undo ExchangeEmailer's global BaseProtocol.HTTP_ADAPTER_CLS patch once per test module."""
+    original = BaseProtocol.HTTP_ADAPTER_CLS
+    yield
+    BaseProtocol.HTTP_ADAPTER_CLS = original
+
+
 @pytest.fixture(autouse=True)
 def mock_ssl_and_adapter():
     """Globally mock SSL context creation and SecureHTTPAdapter."""
     with (
-        patch("exmailer.core.ssl.create_default_context") as mock_ssl,
+        patch("exmailer.transport.ssl.create_default_context") as mock_ssl,
         patch("exmailer.core.SecureHTTPAdapter") as mock_adapter,
     ):
         mock_ctx = MagicMock()
@@ -32,48 +53,48 @@ def mock_ssl_and_adapter():
         mock_adapter_instance = MagicMock()
         mock_adapter.return_value = mock_adapter_instance
 
+        _verified_ssl_context.cache_clear()
         yield {"ssl_context": mock_ctx, "adapter": mock_adapter_instance}
+        _verified_ssl_context.cache_clear()
 
 
 @pytest.fixture
-def mock_exchange_account():
-    """Mock Exchange account connection."""
+def exchange_mock_tree():
+    """Fresh Exchange mocks for each test, so no configured state carries over."""
     mock_account = MagicMock(spec=Account)
     mock_account.primary_smtp_address = "test@company.com"
+    mock_account.protocol = MagicMock()
+    return {
+        "credentials": MagicMock(spec=Credentials),
+        "configuration": MagicMock(spec=Configuration),
+        "account": MagicMock(),
+        "mock_account": mock_account,
+        "message_cls": MagicMock(),
+    }
 
-    # Mock protocol and session for the new mounting logic
-    mock_protocol = MagicMock()
-    mock_session = MagicMock()
-    mock_protocol.session = mock_session
-    mock_account.protocol = mock_protocol
 
-    return mock_account
+@pytest.fixture
+def mock_exchange_account(exchange_mock_tree):
+    """Mock Exchange account connection."""
+    return exchange_mock_tree["mock_account"]
 
 
 @pytest.fixture
-def mock_exchange_connection(mock_exchange_account):
+def mock_exchange_connection(exchange_mock_tree):
     """Mock the entire Exchange connection process, including the Message class."""
-    with (
-        patch("exmailer.core.Credentials", spec=Credentials) as mock_creds,
-        patch("exmailer.core.Configuration", spec=Configuration) as mock_config,
-        patch("exmailer.core.Account", return_value=mock_exchange_account) as mock_account_cls,
-        patch("exmailer.core.Message") as mock_message_cls,
-    ):  # <--- NEW: Mock Message class
-        mock_creds.return_value = MagicMock()
-        mock_config.return_value = MagicMock()
-
-        # Setup the Message instance that will be returned when Message() is called
-        mock_message_instance = mock_message_cls.return_value
-        mock_message_instance.send = MagicMock()
-        mock_message_instance.attach = MagicMock()
-
+    exchange_mock_tree["account"].return_value = exchange_mock_tree["mock_account"]
+
+    with patch.multiple(
+        "exmailer.core",
+        Credentials=exchange_mock_tree["credentials"],
+        Configuration=exchange_mock_tree["configuration"],
+        Account=exchange_mock_tree["account"],
+        Message=exchange_mock_tree["message_cls"],
+    ):
         yield {
-            "credentials": mock_creds,
-            "configuration": mock_config,
-            "account": mock_account_cls,
-            "mock_account": mock_exchange_account,
-            "message_cls": mock_message_cls,  # Return class to check constructor args
-            "message_instance": mock_message_instance,  # Return instance to check send() calls
+            **exchange_mock_tree,
+            # Return instance to check send() calls
+            "message_instance": exchange_mock_tree["message_cls"].return_value,
         }
 
 
@@ -120,3 +141,9 @@ def minimal_config_env():
     os.environ["EXCHANGE_SERVER"] = "mail.company.com"
     os.environ["EXCHANGE_EMAIL_DOMAIN"] = "company.com"
     return os.environ
+
+
+@pytest.fixture
+def emailer(mock_exchange_connection, sample_config):
+    """An ExchangeEmailer connected through the mocked Exchange connection."""
+    return ExchangeEmailer(config=sample_config)
@@ -1,18 +1,100 @@
 """Tests for CLI interface."""
 
 import datetime
+import hashlib
+import io
 import sys
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from exmailer.cli import main, parse_args
+from exmailer.cli import _template_name, build_parser, main, parse_args, resolve_attachments
 from exmailer.exceptions import ConfigurationError
+from exmailer.templates import register_custom_template
 
 
-def test_parse_args_basic():
+@pytest.fixture(scope="session")
+def cli_parser():
+    """The CLI argument parser, built once for the whole test session."""
+    return build_parser()
+
+
+def make_emailer(send_result=True):
+    """A stand-in emailer whose only behaviour is a send_email mock returning send_result."""
+    return SimpleNamespace(send_email=Mock(return_value=send_result))
+
+
+@pytest.fixture
+def mock_emailer_cls():
+    """Patch the ExchangeEmailer class used by the CLI."""
+    with patch("exmailer.cli.ExchangeEmailer") as emailer_cls:
+        yield emailer_cls
+
+
+BODY_FILE_CONTENT = "سلام دنیا! This is a test with Unicode: 你好 🌍"
+INVALID_TEMPLATES = [
+    "<html><body>No placeholder</body></html>",
+    "<html><body>{{body}}</body></html>",
+]
+
+
+@pytest.fixture(scope="session")
+def body_file(tmp_path_factory):
+    """A UTF-8 body file with Persian/Unicode content, written once per session."""
+    path = tmp_path_factory.mktemp("body") / "body.txt"
+    path.write_text(BODY_FILE_CONTENT, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def memory_files(monkeypatch):
+    """Serve Path.read_text() from a path -> bytes dict; other paths still read from disk."""
+    files: dict[str, bytes] = {}
+    read_text = Path.read_text
+
+    def fake_read_text(self, encoding=None, errors=None, newline=None):
+        data = files.get(str(self))
+        if data is None:
+            return read_text(self, encoding=encoding, errors=errors, newline=newline)
+        # Decode like open() in text mode, universal newlines included
+        return io.TextIOWrapper(io.BytesIO(data), encoding, errors, newline).read()
+
+    monkeypatch.setattr(Path, "read_text", fake_read_text)
+    return files
+
+
+@pytest.fixture
+def invalid_utf8_body_file(memory_files):
+    """An in-memory body file holding Latin-1 bytes that are not valid UTF-8."""
+    path = "invalid_utf8.txt"
+    memory_files[path] = b"Text with \xff invalid UTF-8 byte"
+    return path
+
+
+@pytest.fixture(scope="session")
+def custom_template_file(tmp_path_factory):
+    """A valid custom template file, written once per session."""
+    path = tmp_path_factory.mktemp("tpl") / "custom.html"
+    path.write_text("<html><body>{body}</body></html>", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="session")
+def invalid_template_files(tmp_path_factory):
+    """Template files without a usable {body} placeholder, keyed by content."""
+    directory = tmp_path_factory.mktemp("tpl")
+    paths = {}
+    for index, content in enumerate(INVALID_TEMPLATES):
+        paths[content] = directory / f"invalid_{index}.html"
+        paths[content].write_text(content, encoding="utf-8")
+    return paths
+
+
+def test_parse_args_basic(cli_parser):
     """Test basic argument parsing."""
-    args = parse_args(
+    args = cli_parser.parse_args(
         [
             "--subject",
             "Test Subject",
@@ -29,9 +111,9 @@ def test_parse_args_basic():
     assert args.template_file is None
 
 
-def test_parse_args_english_template():
+def test_parse_args_english_template(cli_parser):
     """Test parsing --template english flag."""
-    args = parse_args(
+    args = cli_parser.parse_args(
         [
             "--subject",
             "Test",
@@ -46,9 +128,9 @@ def test_parse_args_english_template():
     assert args.template == "english"
 
 
-def test_parse_args_template_vars():
+def test_parse_args_template_vars(cli_parser):
     """Test parsing template variables JSON."""
-    args = parse_args(
+    args = cli_parser.parse_args(
         [
             "--subject",
             "Report",
@@ -63,9 +145,18 @@ def test_parse_args_template_vars():
     assert args.template_vars == {"date": "1404/11/18", "name": "علی"}
 
 
-def test_parse_args_attachments():
+def test_parse_args_template_vars_empty_and_invalid():
+    """Test that empty --template-vars means no variables and invalid JSON is rejected."""
+    base = ["--subject", "Report", "--body", "Content", "--to", "user@company.com"]
+
+    assert parse_args([*base, "--template-vars", ""]).template_vars == {}
+    with pytest.raises(SystemExit):
+        parse_args([*base, "--template-vars", "{not json"])
+
+
+def test_parse_args_attachments(cli_parser):
     """Test parsing multiple attachments."""
-    args = parse_args(
+    args = cli_parser.parse_args(
         [
             "--subject",
             "With Files",
@@ -81,6 +172,30 @@ def test_parse_args_attachments():
     assert args.attachments == ["file1.pdf", "file2.xlsx"]
 
 
+def test_resolve_attachments_skips_missing(tmp_path, capsys):
+    """Test that existing attachments are resolved and missing ones reported."""
+    (tmp_path / "a.pdf").write_bytes(b"a")
+    (tmp_path / "b.pdf").write_bytes(b"b")
+    paths = [str(tmp_path / "a.pdf"), str(tmp_path / "missing.pdf"), str(tmp_path / "b.pdf")]
+
+    attachments = resolve_attachments(paths)
+
+    assert attachments == [str((tmp_path / "a.pdf").resolve()), str((tmp_path / "b.pdf").resolve())]
+    assert "missing.pdf" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need extra privileges on Windows")
+def test_resolve_attachments_follows_symlinks_before_parent_refs(tmp_path):
+    """Test that '..' after a symlinked directory is applied to the link target, as on read."""
+    (tmp_path / "real" / "sub").mkdir(parents=True)
+    (tmp_path / "real" / "a.pdf").write_bytes(b"a")
+    (tmp_path / "link").symlink_to(tmp_path / "real" / "sub")
+
+    attachments = resolve_attachments([str(tmp_path / "link" / ".." / "a.pdf")])
+
+    assert attachments == [str((tmp_path / "real" / "a.pdf").resolve())]
+
+
 def test_cli_missing_required_args():
     """Test CLI exits with error when required args missing."""
     with pytest.raises(SystemExit) as exc_info:
@@ -88,12 +203,19 @@ def test_cli_missing_required_args():
     assert exc_info.value.code != 0
 
 
-@patch("exmailer.cli.ExchangeEmailer")
+def test_build_parser_is_memoized():
+    """Test that parse_args reuses one parser instead of replaying add_argument calls."""
+    assert build_parser() is build_parser()
+
+    with patch.object(build_parser(), "parse_args") as mock_parse:
+        parse_args(["--subject", "S", "--to", "a@b.com"])
+    mock_parse.assert_called_once_with(["--subject", "S", "--to", "a@b.com"])
+
+
 def test_cli_success_flow(mock_emailer_cls):
     """Test successful CLI execution flow."""
-    mock_emailer = MagicMock()
+    mock_emailer = make_emailer(True)
     mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
-    mock_emailer.send_email.return_value = True
 
     test_args = [
         "exmailer",
@@ -110,12 +232,10 @@ def test_cli_success_flow(mock_emailer_cls):
         assert exc_info.value.code == 0
 
 
-@patch("exmailer.cli.ExchangeEmailer")
 def test_cli_failure_flow(mock_emailer_cls):
     """Test CLI handles send failures gracefully."""
-    mock_emailer = MagicMock()
+    mock_emailer = make_emailer(False)
     mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
-    mock_emailer.send_email.return_value = False
 
     test_args = [
         "exmailer",
@@ -132,7 +252,6 @@ def test_cli_failure_flow(mock_emailer_cls):
         assert exc_info.value.code == 1
 
 
-@patch("exmailer.cli.ExchangeEmailer")
 def test_cli_missing_config_error(mock_emailer_cls):
     """Test CLI handles missing configuration gracefully."""
     mock_emailer_cls.side_effect = ConfigurationError("Missing required configuration fields")
@@ -152,123 +271,176 @@ def test_cli_missing_config_error(mock_emailer_cls):
         assert exc_info.value.code == 1
 
 
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_body_from_file_success(mock_emailer_cls, tmp_path):
-    """Test successful reading of body content from file using @ prefix."""
-    mock_emailer = MagicMock()
+@pytest.fixture
+def protected_body_file(tmp_path):
+    """A body file with all permissions removed, restored on teardown for cleanup."""
+    path = tmp_path / "protected.txt"
+    path.write_text("secret", encoding="utf-8")
+    path.chmod(0o000)
+    yield path
+    path.chmod(0o644)
+
+
+@pytest.mark.parametrize(
+    "body_fixture,exit_code",
+    [
+        ("body_file", 0),
+        (None, 1),
+        pytest.param(
+            "protected_body_file",
+            1,
+            marks=pytest.mark.skipif(
+                sys.platform == "win32", reason="chmod 000 does not prevent reads on Windows"
+            ),
+        ),
+        ("invalid_utf8_body_file", 1),
+    ],
+    ids=["success", "not_found", "permission_error", "invalid_utf8"],
+)
+def test_cli_body_from_file(mock_emailer_cls, request, body_fixture, exit_code):
+    """Test reading the body from an @file: Unicode content, missing, unreadable and non-UTF8 files."""
+    mock_emailer = make_emailer(True)
     mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
-    mock_emailer.send_email.return_value = True
-
-    # Create body file with Persian/Unicode content
-    body_file = tmp_path / "body.txt"
-    body_content = "سلام دنیا! This is a test with Unicode: 你好 🌍"
-    body_file.write_text(body_content, encoding="utf-8")
+    body_path = request.getfixturevalue(body_fixture) if body_fixture else "nonexistent.txt"
 
     test_args = [
         "exmailer",
         "--subject",
         "Test",
         "--body",
-        f"@{body_file}",
+        f"@{body_path}",
         "--to",
         "user@company.com",
     ]
     with patch.object(sys, "argv", test_args):
         with pytest.raises(SystemExit) as exc_info:
             main()
-        assert exc_info.value.code == 0
-        # Verify body content was passed to send_email
+    assert exc_info.value.code == exit_code
+
+    if exit_code == 0:
         mock_emailer.send_email.assert_called_once()
-        call_kwargs = mock_emailer.send_email.call_args[1]
-        assert call_kwargs["body"] == body_content
+        assert mock_emailer.send_email.call_args[1]["body"] == BODY_FILE_CONTENT
+    else:
+        mock_emailer.send_email.assert_not_called()
 
 
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_body_from_file_not_found(mock_emailer_cls, tmp_path):
-    """Test error handling when body file does not exist."""
-    test_args = [
-        "exmailer",
-        "--subject",
-        "Test",
-        "--body",
-        "@nonexistent.txt",
-        "--to",
-        "user@company.com",
-    ]
-    with patch.object(sys, "argv", test_args):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 1
+def test_cli_files_use_universal_newlines(mock_emailer_cls, tmp_path):
+    """Test that CRLF and lone CR line endings in body and template files are read as \\n."""
+    mock_emailer = make_emailer(True)
+    mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
+    body_file = tmp_path / "crlf_body.txt"
+    body_file.write_bytes(b"line 1\r\nline 2\rline 3")
+    lf_template = tmp_path / "lf.html"
+    lf_template.write_bytes(b"<div class='newlines'>\n{body}\n</div>")
+    crlf_template = tmp_path / "crlf.html"
+    crlf_template.write_bytes(b"<div class='newlines'>\r\n{body}\r\n</div>")
+
+    for template_file in (lf_template, crlf_template):
+        test_args = [
+            "exmailer",
+            "--subject",
+            "Newlines",
+            "--body",
+            f"@{body_file}",
+            "--to",
+            "user@company.com",
+            "--template-file",
+            str(template_file),
+        ]
+        with patch.object(sys, "argv", test_args):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+            assert exc_info.value.code == 0
 
+    lf_call, crlf_call = mock_emailer.send_email.call_args_list
+    assert lf_call.kwargs["body"] == "line 1\nline 2\nline 3"
+    # Same content up to line endings registers (and sends with) the same template
+    assert lf_call.kwargs["template"] == crlf_call.kwargs["template"]
 
-@pytest.mark.skipif(sys.platform == "win32", reason="chmod 000 does not prevent reads on Windows")
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_body_from_file_permission_error(mock_emailer_cls, tmp_path):
-    """Test error handling for permission denied on body file."""
-    # Create file then make it unreadable
-    body_file = tmp_path / "protected.txt"
-    body_file.write_text("secret", encoding="utf-8")
 
-    # Remove all permissions (safe to do now, as Windows won't run this test)
-    body_file.chmod(0o000)
+def test_cli_custom_template_file(mock_emailer_cls, custom_template_file):
+    """Test using custom template file via --template-file."""
+    mock_emailer = make_emailer(True)
+    mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
 
     test_args = [
         "exmailer",
         "--subject",
-        "Test",
+        "Custom Template",
         "--body",
-        f"@{body_file}",
+        "Message content",
         "--to",
         "user@company.com",
+        "--template-file",
+        str(custom_template_file),
     ]
-
     with patch.object(sys, "argv", test_args):
         with pytest.raises(SystemExit) as exc_info:
             main()
-        assert exc_info.value.code == 1
+        assert exc_info.value.code == 0
+
 
-    # Restore permissions for cleanup
-    body_file.chmod(0o644)
+def test_template_name_is_content_derived():
+    """Test that temporary template names depend only on template bytes."""
+    name = _template_name(b"<p>{body}</p>")
 
+    assert name == "_cli_tmpl_" + hashlib.blake2b(b"<p>{body}</p>", digest_size=8).hexdigest()
+    assert name != _template_name(b"<div>{body}</div>")
 
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_body_from_file_invalid_utf8(mock_emailer_cls, tmp_path):
-    """Test error handling for non-UTF8 encoded body file."""
-    body_file = tmp_path / "invalid_utf8.txt"
-    # Write Latin-1 encoded content that's invalid UTF-8
-    body_file.write_bytes(b"Text with \xff invalid UTF-8 byte")
+
+def test_cli_template_file_registered_once(mock_emailer_cls, tmp_path):
+    """Test that template file content is registered only while missing from the registry."""
+    mock_emailer = make_emailer(True)
+    mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
+
+    template_file = tmp_path / "repeat.html"
+    template_file.write_text("<div class='repeat'>{body}</div>", encoding="utf-8")
 
     test_args = [
         "exmailer",
         "--subject",
-        "Test",
+        "Repeat",
         "--body",
-        f"@{body_file}",
+        "Message content",
         "--to",
         "user@company.com",
+        "--template-file",
+        str(template_file),
     ]
-    with patch.object(sys, "argv", test_args):
+    with (
+        patch.object(sys, "argv", test_args),
+        patch.dict("exmailer.templates._custom_templates", clear=True) as registry,
+        patch("exmailer.cli.register_custom_template", wraps=register_custom_template) as reg,
+    ):
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                main()
+        assert reg.call_count == 1
+
+        # A cleared registry is refilled on the next run instead of failing the send
+        registry.clear()
         with pytest.raises(SystemExit) as exc_info:
             main()
-        assert exc_info.value.code == 1
+        assert exc_info.value.code == 0
+        assert reg.call_count == 2
 
+    templates = [c.kwargs["template"] for c in mock_emailer.send_email.call_args_list]
+    assert templates[0] == templates[1] == templates[2]
+    assert templates[0].startswith("_cli_tmpl_")
 
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_custom_template_file(mock_emailer_cls, tmp_path):
-    """Test using custom template file via --template-file."""
-    mock_emailer = MagicMock()
-    mock_emailer_cls.return_value.__enter__.return_value = mock_emailer
-    mock_emailer.send_email.return_value = True
 
-    template_file = tmp_path / "custom.html"
-    template_file.write_text("<html><body>{body}</body></html>", encoding="utf-8")
+def test_cli_template_file_accepts_braced_body_field(mock_emailer_cls, tmp_path):
+    """Test that {{{body}}} (literal braces around the field) passes the placeholder check."""
+    mock_emailer_cls.return_value.__enter__.return_value = make_emailer(True)
+    template_file = tmp_path / "braced.html"
+    template_file.write_text("<p>{{{body}}}</p>", encoding="utf-8")
 
     test_args = [
         "exmailer",
         "--subject",
-        "Custom Template",
+        "Braced",
         "--body",
-        "Message content",
+        "Content",
         "--to",
         "user@company.com",
         "--template-file",
@@ -280,11 +452,10 @@ def test_cli_custom_template_file(mock_emailer_cls, tmp_path):
         assert exc_info.value.code == 0
 
 
-@patch("exmailer.cli.ExchangeEmailer")
-def test_cli_template_file_missing_placeholder(mock_emailer_cls, tmp_path):
-    """Test error when template file lacks {body} placeholder."""
-    template_file = tmp_path / "invalid.html"
-    template_file.write_text("<html><body>No placeholder</body></html>", encoding="utf-8")
+@pytest.mark.parametrize("content", INVALID_TEMPLATES)
+def test_cli_template_file_missing_placeholder(mock_emailer_cls, invalid_template_files, content):
+    """Test error when template file lacks a usable {body} placeholder."""
+    template_file = invalid_template_files[content]
 
     test_args = [
         "exmailer",
@@ -328,7 +499,6 @@ def test_parse_args_meeting_options():
     assert args.no_rsvp is True
 
 
-@patch("exmailer.cli.ExchangeEmailer")
 def test_cli_meeting_success_flow(mock_emailer_cls):
     """Test successful CLI execution flow for creating a meeting."""
     mock_emailer = MagicMock()
@@ -378,7 +548,6 @@ def test_cli_meeting_success_flow(mock_emailer_cls):
         assert call_kwargs["start"].hour == 10
 
 
-@patch("exmailer.cli.ExchangeEmailer")
 def test_cli_meeting_missing_dates(mock_emailer_cls):
     """Test CLI fails gracefully if --meeting is passed without --start or --end."""
     test_args = [
@@ -399,7 +568,6 @@ def test_cli_meeting_missing_dates(mock_emailer_cls):
         assert exc_info.value.code == 1
 
 
-@patch("exmailer.cli.ExchangeEmailer")
 def test_cli_meeting_invalid_date_format(mock_emailer_cls):
     """Test CLI fails gracefully if the date string is formatted incorrectly."""
     test_args = [
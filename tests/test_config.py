@@ -3,13 +3,23 @@
 import json
 import os
 import sys
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from exmailer.config import load_config
+from exmailer.config import _CONFIG_CACHE, invalidate_config_cache, load_config
 from exmailer.exceptions import ConfigurationError
+from exmailer.utils import json_loads
+
+BASE_FILE_CONFIG = {
+    "domain": "test",
+    "username": "user",
+    "password": "pass",
+    "server": "srv.com",
+    "email_domain": "test.com",
+}
+# BASE_FILE_CONFIG as JSON, left open so a test can append its own fields and the closing brace
+BASE_FILE_JSON_PREFIX = json.dumps(BASE_FILE_CONFIG)[:-1]
 
 
 class TestConfigValidation:
@@ -37,15 +47,11 @@ class TestConfigSourcesPriority:
 
         config_file = tmp_path / "config.json"
         config_file.write_text(
-            json.dumps(
-                {
-                    "domain": "file-domain",
-                    "server": "file-server.com",
-                    "username": "file-user",
-                    "password": "file-pass",
-                    "email_domain": "file.com",
-                }
-            )
+            '{"domain": "file-domain",'
+            ' "server": "file-server.com",'
+            ' "username": "file-user",'
+            ' "password": "file-pass",'
+            ' "email_domain": "file.com"}'
         )
 
         config = load_config(
@@ -70,15 +76,11 @@ class TestConfigSourcesPriority:
 
         config_file = tmp_path / "config.json"
         config_file.write_text(
-            json.dumps(
-                {
-                    "domain": "correct-domain",
-                    "server": "correct-server.com",
-                    "username": "john.doe",
-                    "password": "secure_password",
-                    "email_domain": "company.com",
-                }
-            )
+            '{"domain": "correct-domain",'
+            ' "server": "correct-server.com",'
+            ' "username": "john.doe",'
+            ' "password": "secure_password",'
+            ' "email_domain": "company.com"}'
         )
 
         config = load_config(str(config_file))
@@ -94,6 +96,13 @@ class TestConfigSourcesPriority:
         assert config["username"] == "john.doe"
         assert config["server"] == "mail.company.com"
 
+    def test_env_changes_visible_between_loads(self, minimal_config_env):
+        """Test that environment changes after a load are picked up by the next load."""
+        assert load_config()["server"] == "mail.company.com"
+
+        os.environ["EXCHANGE_SERVER"] = "other.company.com"
+        assert load_config()["server"] == "other.company.com"
+
     def test_safe_defaults_applied_last(self, minimal_config_env):
         """Test that safe defaults (non-sensitive) are applied only when missing."""
         os.environ.pop("EXCHANGE_AUTH_TYPE", None)
@@ -145,6 +154,45 @@ class TestConfigFileHandling:
         config = load_config(str(whitespace_file))
         assert config["domain"] == "company"
 
+    def test_config_file_cached_until_modified(self, tmp_path, clean_environment):
+        """Test that parsed files are reused until the file changes on disk."""
+        config_file = tmp_path / "config.json"
+        base = {
+            "domain": "first",
+            "username": "u",
+            "password": "p",
+            "server": "s",
+            "email_domain": "e",
+        }
+        config_file.write_text(json.dumps(base))
+
+        with patch("exmailer.config.json_loads", wraps=json_loads) as mock_loads:
+            first = load_config(str(config_file))
+            first["domain"] = "mutated"
+            second = load_config(str(config_file))
+
+            assert mock_loads.call_count == 1
+            assert second["domain"] == "first"
+
+            config_file.write_text(json.dumps({**base, "domain": "second-value"}))
+            third = load_config(str(config_file))
+
+            assert mock_loads.call_count == 2
+            assert third["domain"] == "second-value"
+
+    def test_config_file_cache_keeps_one_entry_per_file(self, tmp_path, clean_environment):
+        """Test that editing a file replaces its cache entry instead of adding one per version."""
+        config_file = tmp_path / "config.json"
+        for i in range(5):
+            config_file.write_text(f'{BASE_FILE_JSON_PREFIX}, "password": "secret{i}"}}')
+            # Same size every time, so give each version a distinct mtime explicitly
+            os.utime(config_file, ns=(i * 10**9, i * 10**9))
+            assert load_config(str(config_file))["password"] == f"secret{i}"
+
+        assert len(_CONFIG_CACHE) == 1
+        assert "secret4" in repr(_CONFIG_CACHE)
+        assert "secret0" not in repr(_CONFIG_CACHE)
+
     def test_yaml_config_file_support(self, tmp_path, clean_environment):
         """Test loading configuration from YAML file."""
         yaml_file = tmp_path / "config.yaml"
@@ -160,7 +208,7 @@ save_copy: false
         yaml_file.write_text(yaml_content)
 
         mock_yaml = MagicMock()
-        mock_yaml.safe_load.return_value = {
+        mock_yaml.load.return_value = {
             "domain": "yaml-domain",
             "username": "yaml-user",
             "password": "yaml-pass",
@@ -176,6 +224,21 @@ save_copy: false
             assert config["auth_type"] == "BASIC"
             assert config["save_copy"] is False
 
+    def test_yaml_config_file_uses_fastest_safe_loader(self, tmp_path, clean_environment):
+        """Test that real YAML files are parsed with CSafeLoader when libyaml is available."""
+        yaml = pytest.importorskip("yaml")
+        yaml_file = tmp_path / "config.yml"
+        yaml_file.write_text(
+            "domain: yaml-domain\nusername: u\npassword: p\nserver: s\nemail_domain: e\n"
+        )
+
+        with patch.object(yaml, "load", wraps=yaml.load) as mock_load:
+            config = load_config(str(yaml_file))
+
+        assert config["domain"] == "yaml-domain"
+        expected_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        assert mock_load.call_args.kwargs["Loader"] is expected_loader
+
     def test_yaml_not_installed_raises_helpful_error(self, tmp_path):
         """Test that missing pyyaml gives helpful error message."""
         yaml_file = tmp_path / "config.yaml"
@@ -196,17 +259,13 @@ class TestConfigNormalization:
         """Test that common config aliases are normalized to standard keys."""
         alias_config = tmp_path / "aliases.json"
         alias_config.write_text(
-            json.dumps(
-                {
-                    "exchange_domain": "alias-domain",
-                    "user": "alias-user",
-                    "pass": "alias-pass",
-                    "host": "alias-host.com",
-                    "domain_name": "alias.com",
-                    "authentication": "BASIC",
-                    "save": False,
-                }
-            )
+            '{"exchange_domain": "alias-domain",'
+            ' "user": "alias-user",'
+            ' "pass": "alias-pass",'
+            ' "host": "alias-host.com",'
+            ' "domain_name": "alias.com",'
+            ' "authentication": "BASIC",'
+            ' "save": false}'
         )
 
         config = load_config(str(alias_config))
@@ -219,9 +278,39 @@ class TestConfigNormalization:
         assert config["auth_type"] == "BASIC"
         assert config["save_copy"] is False
 
-    def test_boolean_normalization(self, tmp_path):
-        """Test that various boolean representations are normalized correctly."""
-        test_cases = [
+    def test_canonical_key_wins_over_alias(self):
+        """Test that the canonical key takes priority regardless of dict order."""
+        config = load_config(
+            config_dict={
+                "user": "alias-user",
+                "username": "canonical-user",
+                "domain": "d",
+                "password": "p",
+                "server": "s",
+                "email_domain": "e",
+            },
+            use_env=False,
+        )
+        assert config["username"] == "canonical-user"
+
+    def test_alias_priority_follows_mapping_order(self):
+        """Test that the earlier alias wins when only aliases are given, in any order."""
+        config = load_config(
+            config_dict={
+                "ad_domain": "ad",
+                "exchange_domain": "exchange",
+                "user": "u",
+                "pass": "p",
+                "host": "s",
+                "domain_name": "e",
+            },
+            use_env=False,
+        )
+        assert config["domain"] == "exchange"
+
+    @pytest.mark.parametrize(
+        "input_val,expected",
+        [
             ("true", True),
             ("True", True),
             ("TRUE", True),
@@ -235,130 +324,150 @@ class TestConfigNormalization:
             ("off", False),
             (True, True),
             (False, False),
-        ]
-
-        for input_val, expected in test_cases:
-            config_file = tmp_path / f"bool_{input_val!s}.json"
-            config_file.write_text(
-                json.dumps(
-                    {
-                        "domain": "test",
-                        "username": "user",
-                        "password": "pass",
-                        "server": "srv.com",
-                        "email_domain": "test.com",
-                        "save_copy": input_val,
-                    }
-                )
-            )
-
-            config = load_config(str(config_file))
-            assert config["save_copy"] == expected, f"Failed for input: {input_val}"
+        ],
+    )
+    def test_boolean_normalization(self, tmp_path, input_val, expected):
+        """Test that various boolean representations are normalized correctly."""
+        config_file = tmp_path / "bool.json"
+        config_file.write_text(f'{BASE_FILE_JSON_PREFIX}, "save_copy": {json.dumps(input_val)}}}')
+
+        config = load_config(str(config_file))
+        assert config["save_copy"] == expected
+
+    @pytest.mark.parametrize(
+        "env_value,expected",
+        [("Y", True), ("yes", True), ("off", False), ("n", False), ("maybe", True)],
+    )
+    def test_env_boolean_parsing(self, minimal_config_env, env_value, expected):
+        """Test EXCHANGE_SAVE_COPY parsing; unrecognized values fall back to the default."""
+        os.environ["EXCHANGE_SAVE_COPY"] = env_value
+
+        config = load_config()
+        assert config["save_copy"] is expected
 
 
 class TestAutoDiscovery:
     """Test automatic config file discovery in standard locations."""
 
-    def test_auto_discovery_in_cwd(self, tmp_path, clean_environment):
+    def test_auto_discovery_in_cwd(self, tmp_path, clean_environment, monkeypatch):
         """Test that config file in current working directory is auto-discovered."""
         config_file = tmp_path / "exmailer.json"
         config_file.write_text(
-            json.dumps(
-                {
-                    "domain": "cwd-domain",
-                    "username": "cwd-user",
-                    "password": "cwd-pass",
-                    "server": "cwd-server.com",
-                    "email_domain": "cwd.com",
-                }
-            )
+            '{"domain": "cwd-domain",'
+            ' "username": "cwd-user",'
+            ' "password": "cwd-pass",'
+            ' "server": "cwd-server.com",'
+            ' "email_domain": "cwd.com"}'
         )
 
-        original_cwd = Path.cwd()
-        try:
-            os.chdir(tmp_path)
-            config = load_config()
-            assert config["domain"] == "cwd-domain"
-            assert config["username"] == "cwd-user"
-        finally:
-            os.chdir(original_cwd)
+        monkeypatch.chdir(tmp_path)
+        config = load_config()
+        assert config["domain"] == "cwd-domain"
+        assert config["username"] == "cwd-user"
 
     def test_auto_discovery_priority_order(self, tmp_path, clean_environment, monkeypatch):
         """Test that auto-discovery follows correct priority order."""
-        mock_home = tmp_path / "fake_home"
-        mock_home.mkdir()
-        monkeypatch.setattr(Path, "home", lambda: mock_home)
+        user_config_dir = tmp_path / "fake_home" / ".config" / "exmailer"
+        user_config_dir.mkdir(parents=True)
+        monkeypatch.setattr("exmailer.config._user_config_dir", lambda: user_config_dir)
 
         # Lower priority
-        (mock_home / "exmailer.json").write_text(
-            json.dumps(
-                {
-                    "domain": "home-domain",
-                    "username": "home",
-                    "password": "p",
-                    "server": "s",
-                    "email_domain": "e",
-                }
-            )
+        (user_config_dir / "config.json").write_text(
+            '{"domain": "home-domain",'
+            ' "username": "home",'
+            ' "password": "p",'
+            ' "server": "s",'
+            ' "email_domain": "e"}'
         )
 
         # Higher priority
         cwd_config = tmp_path / "exmailer.json"
         cwd_config.write_text(
-            json.dumps(
-                {
-                    "domain": "cwd-domain",
-                    "username": "cwd",
-                    "password": "p",
-                    "server": "s",
-                    "email_domain": "e",
-                }
-            )
+            '{"domain": "cwd-domain",'
+            ' "username": "cwd",'
+            ' "password": "p",'
+            ' "server": "s",'
+            ' "email_domain": "e"}'
         )
 
-        original_cwd = Path.cwd()
-        try:
-            os.chdir(tmp_path)
-            config = load_config()
-            # CWD > Home
-            assert config["domain"] == "cwd-domain"
-        finally:
-            os.chdir(original_cwd)
+        monkeypatch.chdir(tmp_path)
+        config = load_config()
+        # CWD > Home
+        assert config["domain"] == "cwd-domain"
+
+    def test_auto_discovery_in_user_config_dir(self, tmp_path, clean_environment, monkeypatch):
+        """Test that ~/.config/exmailer is searched when cwd has no config."""
+        user_config_dir = tmp_path / "home" / ".config" / "exmailer"
+        user_config_dir.mkdir(parents=True)
+        (user_config_dir / "exmailer.json").write_text(
+            '{"domain": "home-domain",'
+            ' "username": "home",'
+            ' "password": "p",'
+            ' "server": "s",'
+            ' "email_domain": "e"}'
+        )
+        monkeypatch.setattr("exmailer.config._user_config_dir", lambda: user_config_dir)
+        monkeypatch.chdir(tmp_path)
+
+        config = load_config()
+
+        assert config["domain"] == "home-domain"
+
+    def test_discovery_memoized_until_invalidated(self, tmp_path, minimal_config_env, monkeypatch):
+        """Test that discovery results are reused until the cache is invalidated."""
+        monkeypatch.chdir(tmp_path)
+        assert load_config()["domain"] == "company"
+
+        (tmp_path / "exmailer.json").write_text('{"domain": "late-domain"}')
+        assert load_config()["domain"] == "company"
+
+        invalidate_config_cache()
+        assert load_config()["domain"] == "late-domain"
+
+    def test_yaml_discovery_skipped_without_pyyaml(self, tmp_path, minimal_config_env, monkeypatch):
+        """Test that YAML candidates are not probed when PyYAML is unavailable."""
+        (tmp_path / "exmailer.yaml").write_text("domain: yaml-domain")
+        monkeypatch.setattr("exmailer.config._module_available", lambda name: name != "yaml")
+        monkeypatch.chdir(tmp_path)
+
+        config = load_config()
 
-    def test_explicit_path_skips_auto_discovery(self, tmp_path, clean_environment):
+        assert config["domain"] == "company"
+
+    def test_discovery_ignores_directories_named_like_configs(
+        self, tmp_path, minimal_config_env, monkeypatch
+    ):
+        """Test that a directory called exmailer.json is not mistaken for a config file."""
+        (tmp_path / "exmailer.json").mkdir()
+        monkeypatch.setattr("exmailer.config._user_config_dir", lambda: None)
+        monkeypatch.chdir(tmp_path)
+
+        config = load_config()
+
+        assert config["domain"] == "company"
+
+    def test_explicit_path_skips_auto_discovery(self, tmp_path, clean_environment, monkeypatch):
         """Test that explicit config_path skips auto-discovery."""
         (tmp_path / "exmailer.json").write_text(
-            json.dumps(
-                {
-                    "domain": "wrong-domain",
-                    "username": "u",
-                    "password": "p",
-                    "server": "s",
-                    "email_domain": "e",
-                }
-            )
+            '{"domain": "wrong-domain",'
+            ' "username": "u",'
+            ' "password": "p",'
+            ' "server": "s",'
+            ' "email_domain": "e"}'
         )
 
         explicit_config = tmp_path / "explicit.json"
         explicit_config.write_text(
-            json.dumps(
-                {
-                    "domain": "correct-domain",
-                    "username": "u",
-                    "password": "p",
-                    "server": "s",
-                    "email_domain": "e",
-                }
-            )
+            '{"domain": "correct-domain",'
+            ' "username": "u",'
+            ' "password": "p",'
+            ' "server": "s",'
+            ' "email_domain": "e"}'
         )
 
-        original_cwd = Path.cwd()
-        try:
-            os.chdir(tmp_path)
-            config = load_config(str(explicit_config))
-            assert config["domain"] == "correct-domain"
-        finally:
-            os.chdir(original_cwd)
+        monkeypatch.chdir(tmp_path)
+        config = load_config(str(explicit_config))
+        assert config["domain"] == "correct-domain"
 
 
 class TestSecurityAndEdgeCases:
@@ -388,7 +497,7 @@ class TestSecurityAndEdgeCases:
 
         assert "password" in str(exc_info.value).lower()
 
-    def test_dotenv_file_support(self, tmp_path, clean_environment):
+    def test_dotenv_file_support(self, tmp_path, clean_environment, monkeypatch):
         """Test that .env file is loaded if python-dotenv available."""
         # Setup specific valid config for this test
         env_vars = {
@@ -408,31 +517,35 @@ class TestSecurityAndEdgeCases:
 
         mock_dotenv.load_dotenv.side_effect = load_dotenv_side_effect
 
+        (tmp_path / ".env").write_text("EXCHANGE_DOMAIN=dotenv-domain\n")
+
+        with patch.dict(sys.modules, {"dotenv": mock_dotenv}):
+            monkeypatch.chdir(tmp_path)
+            config = load_config()
+
+            assert mock_dotenv.load_dotenv.called
+            assert config["domain"] == "dotenv-domain"
+            assert config["username"] == "dotenv-user"
+
+    def test_dotenv_not_imported_without_env_file(self, tmp_path, minimal_config_env, monkeypatch):
+        """Test that python-dotenv is never touched when there is no .env file."""
+        mock_dotenv = MagicMock()
+        monkeypatch.chdir(tmp_path)
+
         with patch.dict(sys.modules, {"dotenv": mock_dotenv}):
-            original_cwd = Path.cwd()
-            try:
-                os.chdir(tmp_path)
-                config = load_config()
+            load_config()
 
-                assert mock_dotenv.load_dotenv.called
-                assert config["domain"] == "dotenv-domain"
-                assert config["username"] == "dotenv-user"
-            finally:
-                os.chdir(original_cwd)
+        assert not mock_dotenv.load_dotenv.called
 
     def test_config_with_extra_fields_ignored(self, tmp_path):
         config_file = tmp_path / "config.json"
         config_file.write_text(
-            json.dumps(
-                {
-                    "domain": "test",
-                    "username": "user",
-                    "password": "pass",
-                    "server": "srv.com",
-                    "email_domain": "test.com",
-                    "extra": "ignore me",
-                }
-            )
+            '{"domain": "test",'
+            ' "username": "user",'
+            ' "password": "pass",'
+            ' "server": "srv.com",'
+            ' "email_domain": "test.com",'
+            ' "extra": "ignore me"}'
         )
         config = load_config(str(config_file))
         assert config["domain"] == "test"
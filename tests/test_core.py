@@ -1,26 +1,81 @@
 """Tests for core ExchangeEmailer functionality (with mocked Exchange server)."""
 
+import contextlib
+import logging
 import ssl
+import subprocess
+import sys
+from unittest.mock import DEFAULT, MagicMock
 
 import pytest
+from exchangelib.errors import TransportError, UnauthorizedError
 from exchangelib.protocol import BaseProtocol
 
-from exmailer.core import ExchangeEmailer, SecureHTTPAdapter
+from exmailer.core import ExchangeEmailer
 from exmailer.exceptions import AuthenticationError, ExchangeEmailConnectionError, SendError
-from exmailer.templates import TemplateType
+from exmailer.templates import TemplateType, compile_template
+from exmailer.transport import SecureHTTPAdapter
 from exmailer.utils import validate_attachments
 
 
+def _assert_sent(mock_exchange_connection, emailer, **send_kwargs):
+    """Send one email and assert it reported success and reached Message.send()."""
+    assert emailer.send_email(**send_kwargs) is True
+    mock_exchange_connection["message_instance"].send.assert_called_once()
+
+
+def _assert_body_contains(mock_exchange_connection, *needles):
+    """Assert the last Message body contains every needle, and return the body as text."""
+    # str() unwraps the HTMLBody once for all checks
+    body = str(mock_exchange_connection["message_cls"].call_args.kwargs["body"])
+    missing = [needle for needle in needles if needle not in body]
+    assert not missing, f"missing from body: {missing}"
+    return body
+
+
 def test_secure_adapter_sets_context():
     ctx = ssl.create_default_context()
     adapter = SecureHTTPAdapter(ssl_context=ctx)
     assert adapter.ssl_context is ctx
 
 
-def test_init_with_programmatic_config(mock_exchange_connection, sample_config):
-    """Test initializing with programmatic config dict."""
-    emailer = ExchangeEmailer(config=sample_config)
+def test_adapters_share_one_ssl_context(mock_ssl_and_adapter):
+    """Test that adapters built without arguments (as exchangelib does) share one context."""
+    first = SecureHTTPAdapter()
+    second = SecureHTTPAdapter()
+
+    assert first.ssl_context is second.ssl_context is mock_ssl_and_adapter["ssl_context"]
+    ssl.create_default_context.assert_called_once()
+
+
+def test_unverified_ssl_fallback_is_not_cached(mock_ssl_and_adapter, caplog):
+    """Test that a failed verified context is retried, not replaced by a cached fallback."""
+    ssl.create_default_context.side_effect = [ssl.SSLError("no CA bundle"), DEFAULT]
+
+    fallback = SecureHTTPAdapter()
+    recovered = SecureHTTPAdapter()
+
+    assert fallback.ssl_context.verify_mode == ssl.CERT_NONE
+    assert recovered.ssl_context is mock_ssl_and_adapter["ssl_context"]
+    assert "SSL configuration failed" in caplog.text
 
+
+def test_ssl_context_preloaded_once_per_process(mock_exchange_connection, sample_config):
+    """Test that constructing emailers builds the shared SSL context exactly once."""
+    ExchangeEmailer(config=sample_config)
+    ExchangeEmailer(config=sample_config)
+
+    ssl.create_default_context.assert_called_once()
+
+
+def test_import_defers_heavy_dependencies():
+    """Test that importing exmailer defers the heavy exchangelib and requests imports."""
+    code = "import sys, exmailer; assert not {'exchangelib', 'requests'} & set(sys.modules)"
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+def test_init_with_programmatic_config(mock_exchange_connection, emailer):
+    """Test initializing with programmatic config dict."""
     assert emailer.config["domain"] == "company"
     assert emailer.config["username"] == "john.doe"
 
@@ -39,11 +94,11 @@ def test_init_with_config_file(mock_exchange_connection, config_file):
     assert emailer.config["server"] == "mail.company.com"
 
 
-def test_send_email_with_persian_template(mock_exchange_connection, sample_config):
+def test_send_email_with_persian_template(mock_exchange_connection, emailer):
     """Test sending email with Persian RTL template."""
-    emailer = ExchangeEmailer(config=sample_config)
-
-    success = emailer.send_email(
+    _assert_sent(
+        mock_exchange_connection,
+        emailer,
         subject="تست",
         body="متن پیام فارسی",
         recipients=["recipient@company.com"],
@@ -54,79 +109,174 @@ def test_send_email_with_persian_template(mock_exchange_connection, sample_confi
     # Wrap the generator in list() to consume and compare it
     assert list(validate_attachments([])) == []
 
-    assert success is True
+    _assert_body_contains(mock_exchange_connection, 'dir="rtl"', "متن پیام فارسی")
 
-    # Retrieve the arguments passed to the Message constructor
-    message_cls = mock_exchange_connection["message_cls"]
-    _, kwargs = message_cls.call_args
 
-    # Check body content (converted to string to handle HTMLBody wrapper)
-    body_str = str(kwargs["body"])
-    assert "direction: rtl" in body_str or 'dir="rtl"' in body_str
-    assert "متن پیام فارسی" in body_str
+def test_send_email_wraps_recipients_in_mailboxes(mock_exchange_connection, emailer):
+    """Test that To/CC/BCC addresses are passed to Message as Mailbox objects."""
+    emailer.send_email(
+        subject="Recipients",
+        body="Body",
+        recipients=["to@company.com"],
+        cc_recipients=["cc@company.com"],
+        template=None,
+    )
 
-    # Verify send was called
-    message_instance = mock_exchange_connection["message_instance"]
-    assert message_instance.send.called
+    _, kwargs = mock_exchange_connection["message_cls"].call_args
+    assert [m.email_address for m in kwargs["to_recipients"]] == ["to@company.com"]
+    assert [m.email_address for m in kwargs["cc_recipients"]] == ["cc@company.com"]
+    assert kwargs["bcc_recipients"] == []
 
+    emailer.send_email(subject="Again", body="Body", recipients=["to@company.com"], template=None)
+
+    _, again = mock_exchange_connection["message_cls"].call_args
+    # Each message gets its own (mutable) Mailbox objects
+    assert again["to_recipients"][0] is not kwargs["to_recipients"][0]
 
-def test_send_email_with_english_template(mock_exchange_connection, sample_config):
-    """Test sending email with English LTR template."""
-    emailer = ExchangeEmailer(config=sample_config)
 
-    success = emailer.send_email(
+def test_send_email_with_english_template(mock_exchange_connection, emailer):
+    """Test sending email with English LTR template."""
+    _assert_sent(
+        mock_exchange_connection,
+        emailer,
         subject="Test",
         body="English message content",
         recipients=["recipient@company.com"],
         template=TemplateType.DEFAULT,
     )
 
-    assert success is True
-
-    message_cls = mock_exchange_connection["message_cls"]
-    _, kwargs = message_cls.call_args
-    body_str = str(kwargs["body"])
-
-    assert "English message content" in body_str
+    body_str = _assert_body_contains(mock_exchange_connection, "English message content")
     assert 'dir="rtl"' not in body_str
 
 
-def test_send_email_plain_text(mock_exchange_connection, sample_config):
+def test_send_email_plain_text(mock_exchange_connection, emailer):
     """Test sending email without template (plain HTML)."""
-    emailer = ExchangeEmailer(config=sample_config)
-
-    success = emailer.send_email(
+    _assert_sent(
+        mock_exchange_connection,
+        emailer,
         subject="Plain",
         body="<p>Raw HTML content</p>",
         recipients=["recipient@company.com"],
         template=None,
     )
 
-    assert success is True
+    _assert_body_contains(mock_exchange_connection, "<p>Raw HTML content</p>")
+
+
+@pytest.mark.parametrize("template", ["plain", "PLAIN", "none"])
+def test_send_email_plain_aliases_skip_wrapping(mock_exchange_connection, emailer, template):
+    """Test that every plain alias sends the rendered body unchanged."""
+    template_vars = {"name": "Ali"}
+
+    emailer.send_email(
+        subject="Plain",
+        body="<p>Hi {name}</p>",
+        recipients=["recipient@company.com"],
+        template=template,
+        template_vars=template_vars,
+    )
+
+    _, kwargs = mock_exchange_connection["message_cls"].call_args
+    assert str(kwargs["body"]) == "<p>Hi Ali</p>"
+    assert template_vars == {"name": "Ali"}
+
+
+def test_send_email_plain_text_formats_body_once(mock_exchange_connection, emailer):
+    """Test that substituted values are not re-parsed as format fields."""
+    emailer.send_email(
+        subject="Plain",
+        body="<p>{snippet}</p>",
+        recipients=["recipient@company.com"],
+        template=None,
+        template_vars={"snippet": "if (x) {return y;}"},
+    )
+
+    _, kwargs = mock_exchange_connection["message_cls"].call_args
+    assert str(kwargs["body"]) == "<p>if (x) {return y;}</p>"
+
+
+def test_message_bodies_stay_out_of_template_cache(mock_exchange_connection, emailer):
+    """Test that only templates, never message bodies, enter the compiled-template cache."""
+    compile_template.cache_clear()
+
+    emailer.send_email(
+        subject="S",
+        body="<p>Hi {name}</p>",
+        recipients=["a@company.com"],
+        template=None,
+        template_vars={"name": "Ali"},
+    )
+    assert compile_template.cache_info().currsize == 0
+
+    emailer.send_email(
+        subject="S",
+        body="<p>Hi {name}</p>",
+        recipients=["a@company.com"],
+        template=TemplateType.DEFAULT,
+        template_vars={"name": "Ali"},
+    )
+    assert compile_template.cache_info().currsize == 1
+    _assert_body_contains(mock_exchange_connection, "<p>Hi Ali</p>")
+
+
+def test_send_many_reuses_body_with_different_vars(mock_exchange_connection, emailer):
+    """Test that one body text renders correctly for each message's own variables."""
+    mock_exchange_connection["mock_account"].bulk_create.return_value = [True, True]
+    body = "<p>Dear {name}, your code is {code}.</p>"
+
+    emailer.send_many(
+        {
+            "subject": "Code",
+            "body": body,
+            "recipients": [f"{name}@company.com"],
+            "template": None,
+            "template_vars": {"name": name, "code": code},
+        }
+        for name, code in (("ali", 1), ("sara", 2))
+    )
+
+    bodies = [str(c.kwargs["body"]) for c in mock_exchange_connection["message_cls"].call_args_list]
+    assert bodies == ["<p>Dear ali, your code is 1.</p>", "<p>Dear sara, your code is 2.</p>"]
+
+
+@pytest.mark.parametrize(("level", "joined"), [(logging.INFO, True), (logging.WARNING, False)])
+def test_send_email_joins_recipients_only_when_logged(emailer, caplog, level, joined):
+    """Test that the recipient list is only joined when the success record is emitted."""
+    iterations = 0
+
+    class CountingList(list):
+        def __iter__(self):
+            nonlocal iterations
+            iterations += 1
+            return super().__iter__()
 
-    message_cls = mock_exchange_connection["message_cls"]
-    _, kwargs = message_cls.call_args
-    body_str = str(kwargs["body"])
+    caplog.set_level(level, logger="exmailer.core")
+    emailer.send_email(
+        subject="S",
+        body="B",
+        recipients=CountingList(["a@company.com", "b@company.com"]),
+        template=None,
+    )
 
-    assert "<p>Raw HTML content</p>" in body_str
+    # One pass builds the Mailbox list; joins for the log only happen when it is emitted
+    assert (iterations > 1) is joined
+    assert ("sent successfully to a@company.com, b@company.com" in caplog.text) is joined
 
 
-def test_send_email_with_attachments(mock_exchange_connection, sample_config, tmp_path):
+def test_send_email_with_attachments(mock_exchange_connection, emailer, tmp_path):
     """Test sending email with attachments."""
     attachment = tmp_path / "report.pdf"
     attachment.write_bytes(b"PDF content")
 
-    emailer = ExchangeEmailer(config=sample_config)
-
-    success = emailer.send_email(
+    _assert_sent(
+        mock_exchange_connection,
+        emailer,
         subject="With Attachment",
         body="See attached file",
         recipients=["recipient@company.com"],
         attachments=[str(attachment)],
     )
 
-    assert success is True
-
     # Verify attach was called on the instance
     message_instance = mock_exchange_connection["message_instance"]
     assert message_instance.attach.called
@@ -138,14 +288,12 @@ def test_send_email_with_attachments(mock_exchange_connection, sample_config, tm
     assert file_attachment.content == b"PDF content"
 
 
-def test_send_email_failure_raises_senderror(mock_exchange_connection, sample_config):
+def test_send_email_failure_raises_senderror(mock_exchange_connection, emailer):
     """Test that send failures properly raise SendError."""
     # Configure the message instance to raise exception on send()
     message_instance = mock_exchange_connection["message_instance"]
     message_instance.send.side_effect = Exception("SMTP timeout after 30s")
 
-    emailer = ExchangeEmailer(config=sample_config)
-
     with pytest.raises(SendError) as exc_info:
         emailer.send_email(
             subject="Test",
@@ -156,25 +304,116 @@ def test_send_email_failure_raises_senderror(mock_exchange_connection, sample_co
     assert "SMTP timeout" in str(exc_info.value)
 
 
-def test_authentication_failure_raises_error(mock_exchange_connection, sample_config):
-    """Test that authentication failures raise AuthenticationError."""
-    from exchangelib.errors import UnauthorizedError
+@pytest.mark.parametrize(
+    ("save_copy", "folder_attr", "disposition"),
+    [(True, "sent", "SendAndSaveCopy"), (False, None, "SendOnly")],
+)
+def test_send_many_uses_one_bulk_request(
+    mock_exchange_connection, sample_config, save_copy, folder_attr, disposition
+):
+    """Test that send_many posts all messages with a single bulk_create call."""
+    account = mock_exchange_connection["mock_account"]
+    account.bulk_create.return_value = [MagicMock(), Exception("Mailbox full")]
+
+    emailer = ExchangeEmailer(config={**sample_config, "save_copy": save_copy})
+    result = emailer.send_many(
+        [
+            {"subject": "One", "body": "First", "recipients": ["a@company.com"]},
+            {"subject": "Two", "body": "Second", "recipients": ["b@company.com"], "template": None},
+        ]
+    )
 
-    mock_exchange_connection["account"].side_effect = UnauthorizedError("Invalid credentials")
+    assert result == [True, False]
+    account.bulk_create.assert_called_once()
+    kwargs = account.bulk_create.call_args.kwargs
+    assert len(kwargs["items"]) == 2
+    assert kwargs["message_disposition"] == disposition
+    assert kwargs["folder"] is (getattr(account, folder_attr) if folder_attr else None)
+    assert kwargs["chunk_size"] is None
+    mock_exchange_connection["message_instance"].send.assert_not_called()
 
-    with pytest.raises(AuthenticationError) as exc_info:
-        ExchangeEmailer(config=sample_config)
 
-    assert "Authentication failed" in str(exc_info.value)
+def test_send_many_passes_batch_size(mock_exchange_connection, emailer):
+    """Test that batch_size caps the number of messages per CreateItem request."""
+    account = mock_exchange_connection["mock_account"]
+    account.bulk_create.return_value = [True] * 3
+
+    emailer.send_many(
+        [{"subject": "S", "body": "B", "recipients": ["a@company.com"]}] * 3, batch_size=20
+    )
+
+    assert account.bulk_create.call_args.kwargs["chunk_size"] == 20
+
+
+def test_send_many_wraps_request_failure(mock_exchange_connection, emailer):
+    """Test that a failed bulk request raises SendError, and empty input sends nothing."""
+    account = mock_exchange_connection["mock_account"]
+    account.bulk_create.side_effect = Exception("Connection reset")
+
+    assert emailer.send_many([]) == []
+    with pytest.raises(SendError, match="Connection reset"):
+        emailer.send_many([{"subject": "S", "body": "B", "recipients": ["a@company.com"]}])
+
+
+def test_exchange_version_shared_between_emailers(mock_exchange_connection, sample_config):
+    """Test that every connection is configured with the same pinned Version object."""
+    ExchangeEmailer(config=sample_config)
+    ExchangeEmailer(config=sample_config)
+
+    first, second = mock_exchange_connection["configuration"].call_args_list
+    assert first.kwargs["version"] is second.kwargs["version"]
+    assert first.kwargs["version"].build.major_version == 15
+
+
+def test_context_manager_closes_sessions(mock_exchange_connection, sample_config):
+    """Test that leaving the with-block closes the account's pooled sessions."""
+    protocol = mock_exchange_connection["mock_account"].protocol
+
+    with ExchangeEmailer(config=sample_config) as emailer:
+        assert isinstance(emailer, ExchangeEmailer)
+        protocol.close.assert_not_called()
+
+    protocol.close.assert_called_once()
+
+
+@pytest.mark.parametrize("body_error", [None, SendError("send failed")])
+def test_context_manager_close_failure_is_logged(
+    mock_exchange_connection, emailer, caplog, body_error
+):
+    """Test that a failing close is logged and never hides the with-block's own exception."""
+    mock_exchange_connection["mock_account"].protocol.close.side_effect = OSError("reset")
+
+    with pytest.raises(SendError) if body_error else contextlib.nullcontext() as exc_info:
+        with emailer:
+            if body_error:
+                raise body_error
+
+    if body_error:
+        assert exc_info.value is body_error
+    assert "Failed to close Exchange sessions" in caplog.text
 
 
-def test_connection_failure_raises_error(mock_exchange_connection, sample_config):
-    """Test that connection failures raise ExchangeEmailConnectionError."""
-    from exchangelib.errors import TransportError
+@pytest.fixture
+def failing_exchange_connection(request, mock_exchange_connection):
+    """Mocked Exchange connection whose Account construction raises request.param."""
+    mock_exchange_connection["account"].side_effect = request.param
+    return mock_exchange_connection
 
-    mock_exchange_connection["account"].side_effect = TransportError("Connection refused")
 
-    with pytest.raises(ExchangeEmailConnectionError) as exc_info:
+@pytest.mark.parametrize(
+    ("failing_exchange_connection", "error_cls", "message"),
+    [
+        (UnauthorizedError("Invalid credentials"), AuthenticationError, "Authentication failed"),
+        (TransportError("Connection refused"), ExchangeEmailConnectionError, "Connection failed"),
+    ],
+    indirect=["failing_exchange_connection"],
+    ids=["authentication", "connection"],
+)
+def test_connection_errors_are_wrapped(
+    failing_exchange_connection, sample_config, error_cls, message
+):
+    """Test that authentication and transport failures raise the matching exmailer error."""
+    with pytest.raises(error_cls) as exc_info:
         ExchangeEmailer(config=sample_config)
 
-    assert "Connection failed" in str(exc_info.value)
+    assert message in str(exc_info.value)
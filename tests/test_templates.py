@@ -1,9 +1,12 @@
 """Tests for email template system."""
 
+import re
+
 import pytest
 
 from exmailer.templates import (
     TemplateType,
+    compile_template,
     get_default_template,
     get_minimal_template,
     get_persian_template,
@@ -12,13 +15,16 @@ from exmailer.templates import (
     register_custom_template,
 )
 
+# Either form of right-to-left markup counts: the dir attribute or a CSS direction rule
+RTL_MARKER = re.compile(r'dir="rtl"|direction:\s*rtl', re.IGNORECASE)
+
 
 def test_persian_template_structure():
     """Test Persian template has correct RTL structure."""
     template = get_persian_template()
 
     # Check RTL direction
-    assert 'dir="rtl"' in template or "direction: rtl" in template
+    assert RTL_MARKER.search(template)
     assert 'lang="fa"' in template
 
     # Check placeholder exists
@@ -54,28 +60,41 @@ def test_get_template_by_enum():
     assert "{body}" in get_template(TemplateType.PLAIN)
 
 
-def test_get_template_by_string():
+@pytest.mark.parametrize(
+    ("alias", "expected"),
+    [
+        *((alias, get_persian_template()) for alias in ("persian", "farsi", "rtl", "fa")),
+        *((alias, get_default_template()) for alias in ("default", "english", "ltr", "en")),
+        *((alias, get_minimal_template()) for alias in ("minimal", "simple")),
+        *((alias, "{body}") for alias in ("plain", "none")),
+    ],
+)
+def test_get_template_by_string(alias, expected):
     """Test getting templates using string aliases."""
-    # Persian aliases
-    for alias in ["persian", "farsi", "rtl", "fa"]:
-        template = get_template(alias)
-        assert "{body}" in template
-        # Verify it's actually the Persian template
-        assert "direction: rtl" in template or 'dir="rtl"' in template
+    assert get_template(alias) == expected
+
+
+def test_get_template_returns_shared_builtin_strings():
+    """Test that built-ins are resolved case-insensitively to one shared string."""
+    assert get_template("FARSI") is get_template(TemplateType.PERSIAN)
+    assert get_template("Simple") is get_minimal_template()
+
 
-    # English aliases
-    for alias in ["default", "english", "ltr", "en"]:
-        template = get_template(alias)
-        assert "{body}" in template
+@pytest.mark.parametrize("template", [TemplateType.PERSIAN, TemplateType.DEFAULT, "minimal"])
+def test_builtin_templates_are_minified(template):
+    """Test that built-ins ship without source indentation but keep the body verbatim."""
+    html = get_template(template)
+    body = "<pre>line 1\n    line 2</pre>"
 
-    # Minimal aliases
-    for alias in ["minimal", "simple"]:
-        template = get_template(alias)
-        assert "{body}" in template
+    assert "\n" not in html
+    assert "><" in html
+    assert body in compile_template(html)({"body": body})
 
-    # Plain aliases
-    for alias in ["plain", "none"]:
-        assert get_template(alias) == "{body}"
+
+def test_get_template_rejects_non_string():
+    """Test that a non-string template raises ValueError."""
+    with pytest.raises(ValueError, match="Invalid template type/name"):
+        get_template(42)  # type: ignore[arg-type]
 
 
 def test_register_custom_template():
@@ -100,14 +119,23 @@ def test_register_custom_template():
     assert "my_template" in list_custom_templates()
 
 
-def test_register_template_without_placeholder_raises_error():
-    """Test that registering template without {body} placeholder raises error."""
-    invalid_template = "<html><body>No placeholder</body></html>"
-
+@pytest.mark.parametrize(
+    "invalid_template",
+    ["<html><body>No placeholder</body></html>", "<p>{{body}}</p>", "<p>{body</p>"],
+)
+def test_register_template_without_placeholder_raises_error(invalid_template):
+    """Test that registering template without a real {body} field raises error."""
     with pytest.raises(ValueError, match="must contain {body} placeholder"):
         register_custom_template("invalid", invalid_template)
 
 
+def test_register_template_with_braced_body_field():
+    """Test that {{{body}}} counts as a literal brace around a real {body} field."""
+    register_custom_template("braced", "<p>{{{body}}}</p>")
+
+    assert compile_template(get_template("braced"))({"body": "x"}) == "<p>{x}</p>"
+
+
 def test_get_unknown_template_raises_error():
     """Test that getting unknown template raises KeyError."""
     with pytest.raises(KeyError) as exc_info:
@@ -119,40 +147,11 @@ def test_get_unknown_template_raises_error():
 
 def test_template_variable_substitution():
     """Test template variable substitution works correctly."""
-    from unittest.mock import MagicMock, patch
-
-    from exmailer.core import ExchangeEmailer
-
-    # Mock the entire Exchange connection
-    with (
-        patch("exmailer.core.ExchangeEmailer._connect_to_exchange") as mock_connect,
-        patch("exmailer.core.ExchangeEmailer._create_ssl_context"),
-    ):
-        mock_account = MagicMock()
-        mock_connect.return_value = mock_account
-
-        ExchangeEmailer(
-            config={
-                "domain": "test",
-                "username": "user",
-                "password": "pass",
-                "server": "srv",
-                "email_domain": "test.com",
-            }
-        )
-
-        # Test variable substitution in body before template wrapping
-        body = "Hello {name}, your report for {date} is ready"
-        vars = {"name": "علی", "date": "1404/11/18"}
-
-        # Manually test the substitution logic
-        for key, value in vars.items():
-            body = body.replace(f"{{{key}}}", str(value))
-
-        assert "علی" in body
-        assert "1404/11/18" in body
-        assert "{name}" not in body
-        assert "{date}" not in body
+    # Bodies are rendered with the same compiled formatter as templates, before wrapping
+    body = "Hello {name}, your report for {date} is ready"
+    rendered = compile_template(body)({"name": "علی", "date": "1404/11/18"})
+
+    assert rendered == "Hello علی, your report for 1404/11/18 is ready"
 
 
 def test_persian_text_preservation():
@@ -167,4 +166,34 @@ def test_persian_text_preservation():
     assert persian_text in formatted
 
     # Verify RTL markers are present
-    assert 'dir="rtl"' in formatted or "direction: rtl" in formatted.lower()
+    assert RTL_MARKER.search(formatted)
+
+
+@pytest.mark.parametrize("template", [TemplateType.PERSIAN, TemplateType.DEFAULT, "minimal"])
+def test_compiled_template_matches_str_format(template):
+    """Test that compiled built-in templates render exactly like str.format."""
+    html = get_template(template)
+    values = {"body": "<p>سلام {not a field}</p>"}
+
+    assert compile_template(html)(values) == html.format(**values)
+
+
+def test_compiled_template_body_split_keeps_escapes_on_both_sides():
+    """Test that the prefix/suffix split around {body} keeps escaped braces in place."""
+    html = "a {{x}} b {body} c {{y}} d"
+
+    assert compile_template(html)({"body": "B"}) == "a {x} b B c {y} d"
+
+
+def test_compiled_template_falls_back_for_format_specs():
+    """Test that templates with specs or conversions still render via str.format_map."""
+    html = "{body} {count:>4} {name!r} {{literal}}"
+    values = {"body": "b", "count": 7, "name": "x"}
+
+    assert compile_template(html)(values) == html.format(**values)
+
+
+def test_compiled_template_missing_variable_raises_keyerror():
+    """Test that a missing variable fails the same way str.format does."""
+    with pytest.raises(KeyError):
+        compile_template("{body} {date}")({"body": "b"})
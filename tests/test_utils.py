@@ -1,37 +1,72 @@
 """Tests for utility functions (attachments, MIME types)."""
 
+import logging
 from pathlib import Path
 
+import pytest
+
 from exmailer.utils import get_content_type, validate_attachments
 
 
-def test_mime_type_detection():
+@pytest.fixture(autouse=True)
+def utils_warnings(caplog):
+    """Capture only exmailer.utils warnings, the level attachment problems are logged at."""
+    caplog.set_level(logging.WARNING, logger="exmailer.utils")
+
+
+def _logged(caplog, text: str) -> bool:
+    """Check whether any captured log message contains text."""
+    return any(text in message for message in caplog.messages)
+
+
+def _sparse_file(path: Path, size: int) -> Path:
+    """Create a file of the given size without writing its (all-zero) bytes."""
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return path
+
+
+@pytest.fixture(scope="session")
+def medium_xlsx(tmp_path_factory):
+    """A 5MB attachment, created once per session."""
+    return _sparse_file(tmp_path_factory.mktemp("attachments") / "medium.xlsx", 5 * 1024 * 1024)
+
+
+@pytest.fixture(scope="session")
+def large_pdf(tmp_path_factory):
+    """A 26MB attachment, over the 25MB Exchange limit, created once per session."""
+    return _sparse_file(tmp_path_factory.mktemp("attachments") / "large.pdf", 26 * 1024 * 1024)
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("report.pdf", "application/pdf"),
+        ("data.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+        ("image.JPG", "image/jpeg"),  # Case insensitive
+        (
+            "document.DOCX",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ),
+        ("archive.zip", "application/zip"),
+        ("script.py", "application/octet-stream"),  # Unknown type fallback
+        ("pdf", "application/octet-stream"),  # No extension
+        (".pdf", "application/octet-stream"),  # Dotfile, not an extension
+    ],
+)
+def test_mime_type_detection(filename, expected):
     """Test MIME type detection for common file extensions."""
-    assert get_content_type("report.pdf") == "application/pdf"
-    assert (
-        get_content_type("data.xlsx")
-        == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    assert get_content_type("image.JPG") == "image/jpeg"  # Case insensitive
-    assert (
-        get_content_type("document.DOCX")
-        == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    )
-    assert get_content_type("archive.zip") == "application/zip"
-    assert get_content_type("script.py") == "application/octet-stream"  # Unknown type fallback
+    assert get_content_type(filename) == expected
 
 
-def test_validate_attachments_existing_files(tmp_path):
+def test_validate_attachments_existing_files(tmp_path, medium_xlsx):
     """Test validation of existing attachment files."""
     # Create test files
     small_file = tmp_path / "small.pdf"
     small_file.write_bytes(b"a" * 1024)  # 1KB
 
-    medium_file = tmp_path / "medium.xlsx"
-    medium_file.write_bytes(b"b" * (5 * 1024 * 1024))  # 5MB
-
     # Consume the generator into a list for assertion
-    attachments = list(validate_attachments([str(small_file), str(medium_file)]))
+    attachments = list(validate_attachments([str(small_file), str(medium_xlsx)]))
 
     assert len(attachments) == 2
     assert attachments[0]["name"] == "small.pdf"
@@ -56,8 +91,19 @@ def test_validate_attachments_skips_missing_files(tmp_path, caplog):
 
     assert len(attachments) == 1
     assert attachments[0]["name"] == "exists.txt"
-    assert "missing.pdf" in caplog.text
-    assert "also_missing.docx" in caplog.text
+    assert _logged(caplog, "missing.pdf")
+    assert _logged(caplog, "also_missing.docx")
+
+
+def test_validate_attachments_skips_directories_and_bad_parents(tmp_path, caplog):
+    """Test that directories and paths through a regular file are skipped, not raised."""
+    existing = tmp_path / "exists.txt"
+    existing.write_text("content")
+
+    attachments = list(validate_attachments([str(tmp_path), str(existing / "child.pdf")]))
+
+    assert attachments == []
+    assert sum("Skipping missing or invalid file" in m for m in caplog.messages) == 2
 
 
 def test_validate_attachments_skips_empty_files(tmp_path, caplog):
@@ -73,20 +119,17 @@ def test_validate_attachments_skips_empty_files(tmp_path, caplog):
 
     assert len(attachments) == 1
     assert attachments[0]["name"] == "non_empty.txt"
-    assert "Skipping empty file" in caplog.text
+    assert _logged(caplog, "Skipping empty file")
 
 
-def test_validate_attachments_large_file_warning(tmp_path, caplog):
+def test_validate_attachments_large_file_warning(large_pdf, caplog):
     """Test warning for large files approaching Exchange limits."""
-    large_file = tmp_path / "large.pdf"
-    large_file.write_bytes(b"a" * (26 * 1024 * 1024))  # 26MB > 25MB limit
-
     # Consume the generator into a list
-    attachments = list(validate_attachments([str(large_file)]))
+    attachments = list(validate_attachments([str(large_pdf)]))
 
     assert len(attachments) == 1
-    assert "26.0MB" in caplog.text
-    assert "exceeds 25.0MB limit".lower() in caplog.text.lower()
+    assert _logged(caplog, "26.0MB")
+    assert _logged(caplog, "exceeds 25.0MB limit")
 
 
 def test_validate_attachments_tilde_expansion():
@@ -101,3 +144,27 @@ def test_validate_attachments_tilde_expansion():
     # Simulate what Path.expanduser() would do
     expanded = Path(str(test_file)).expanduser()
     assert expanded == test_file  # In test env, ~ won't expand to real home
+
+
+def test_validate_attachments_preserves_order_and_skips_read_errors(tmp_path, caplog, monkeypatch):
+    """Test that concurrent reads keep input order and log unreadable files."""
+    paths = []
+    for i in range(12):
+        file = tmp_path / f"file{i:02}.txt"
+        file.write_bytes(f"content {i}".encode())
+        paths.append(str(file))
+
+    real_read_bytes = Path.read_bytes
+
+    def flaky_read_bytes(self):
+        if self.name == "file03.txt":
+            raise PermissionError("denied")
+        return real_read_bytes(self)
+
+    monkeypatch.setattr(Path, "read_bytes", flaky_read_bytes)
+
+    attachments = list(validate_attachments(paths))
+
+    assert [a["name"] for a in attachments] == [f"file{i:02}.txt" for i in range(12) if i != 3]
+    assert attachments[0]["content"] == b"content 0"
+    assert _logged(caplog, "Permission denied")